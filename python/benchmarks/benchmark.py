@@ -0,0 +1,148 @@
+"""
+    Offline decoder benchmark on a seeded synthetic corpus and the test images.
+
+    python benchmarks/benchmark.py --seed 417 --count 48 --output report.json
+    python benchmarks/benchmark.py --check-baseline benchmarks/baseline.json --tolerance 0.25
+    python benchmarks/benchmark.py --memory --output memory.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+from pdf417decoder import PDF417Decoder
+from pdf417decoder.StageTimings import StageTimings
+
+from corpus import fixture_cases, synthetic_cases
+from memory import run_memory_profile
+from micro import run_micro_benchmarks
+from regression import MICRO_TOLERANCE, calibrate, compare, format_comparison, load_baseline, save_baseline
+
+TESTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tests")
+
+def run_benchmark(cases: list, repeat: int = 3) -> dict:
+    """Decode every case repeat times, returns the JSON report
+
+    Args:
+        cases (list): CorpusCase list
+        repeat (int, optional): Decodes of each case, the fastest one is kept. Defaults to 3.
+    """
+    decoder = PDF417Decoder(timings=True)
+    timings = StageTimings()
+    case_reports = list()
+    total_seconds = 0.0
+    successes = 0
+
+    for case in cases:
+        best_seconds = None
+
+        for index in range(repeat):
+            start = time.perf_counter()
+            result = decoder.decode_image(case.image)
+            seconds = time.perf_counter() - start
+
+            if (best_seconds is None or seconds < best_seconds):
+                best_seconds = seconds
+                best_timings = result.timings
+
+        success = case.is_success(result)
+        successes += success
+        total_seconds += best_seconds
+        timings.merge(best_timings)
+
+        case_reports.append({"name": case.name, "success": success, "barcodes": len(result), "seconds": best_seconds,
+            "megapixels": case.megapixels, "params": case.params})
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cases": len(cases),
+        "repeat": repeat,
+        "seconds": total_seconds,
+        "decodes_per_second": len(cases) / total_seconds if total_seconds > 0 else 0.0,
+        "success_rate": successes / len(cases) if len(cases) > 0 else 0.0,
+        "stages": timings.as_dict(),
+        "case_results": case_reports,
+    }
+
+def write_report(report: dict, path: str = None):
+    """ JSON report to a file or to standard output """
+    if (path is None):
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        with open(path, "w") as output:
+            json.dump(report, output, indent=2)
+
+def positive_int(text: str) -> int:
+    """ argparse type of the counts that must be at least 1 """
+    value = int(text)
+    if (value < 1):
+        raise argparse.ArgumentTypeError("must be at least 1: " + text)
+    return value
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="PDF417 decoder benchmark")
+    parser.add_argument("--seed", type=int, default=417, help="synthetic corpus seed")
+    parser.add_argument("--count", type=int, default=48, help="synthetic images")
+    parser.add_argument("--repeat", type=positive_int, default=3, help="decodes of each image, the fastest is reported")
+    parser.add_argument("--no-fixtures", action="store_true", help="skip the test images")
+    parser.add_argument("--output", help="JSON report path, defaults to standard output")
+    parser.add_argument("--save-baseline", metavar="PATH", help="write the normalized costs of this run as the baseline")
+    parser.add_argument("--check-baseline", metavar="PATH", help="fail if this run is slower than the baseline (same corpus)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slow down of each metric, 0.25 is 25%%")
+    parser.add_argument("--micro-tolerance", type=float, default=MICRO_TOLERANCE, help="allowed slow down of the micro-benchmarks")
+    parser.add_argument("--memory", action="store_true", help="report peak memory per stage and per megapixel instead of times")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if (args.check_baseline is not None):
+        # decode the corpus the baseline was measured on
+        baseline = load_baseline(args.check_baseline)
+        args.seed = baseline["seed"]
+        args.count = baseline["count"]
+        args.repeat = baseline["repeat"]
+        args.no_fixtures = not baseline["fixtures"]
+
+    cases = list()
+    if (not args.no_fixtures):
+        cases.extend(fixture_cases(TESTS_DIR))
+    if (args.count > 0):
+        cases.extend(synthetic_cases(args.seed, args.count))
+
+    if (args.memory):
+        report = run_memory_profile(cases)
+        report["seed"] = args.seed
+        write_report(report, args.output)
+
+        for stage, memory in report["stages"].items():
+            print("{0:<18} {1:>10.1f} KB peak {2:>10.1f} KB per megapixel".format(stage, memory["peak_bytes"] / 1024,
+                memory["peak_bytes_per_megapixel"] / 1024), file=sys.stderr)
+        return 0
+
+    # calibrated before and after the run, the faster one is the least disturbed
+    calibration_seconds = calibrate()
+    report = run_benchmark(cases, args.repeat)
+    report["seed"] = args.seed
+    report["count"] = args.count
+    report["fixtures"] = not args.no_fixtures
+    report["micro"] = run_micro_benchmarks()
+    report["calibration_seconds"] = min(calibration_seconds, calibrate())
+
+    if (args.save_baseline is not None):
+        save_baseline(args.save_baseline, report)
+
+    if (baseline is not None):
+        rows = compare(baseline, report, args.tolerance, args.micro_tolerance)
+        report["regressions"] = [row[0] for row in rows if (row[4])]
+        print(format_comparison(rows, args.tolerance, args.micro_tolerance), file=sys.stderr)
+
+    write_report(report, args.output)
+
+    print("{0} images, {1:.1f} decodes per second, {2:.1%} decoded".format(report["cases"], report["decodes_per_second"], report["success_rate"]), file=sys.stderr)
+    return 1 if (len(report.get("regressions", ())) > 0) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+import glob
+import os
+import random
+import string
+
+import cv2
+import numpy as np
+from PIL import Image as PIL
+
+from pdf417decoder.Encoder import encode_image
+
+# barcodes in each test image (all other images hold one barcode)
+FIXTURE_BARCODES = {"multiple_barcodes": 2}
+
+# synthetic corpus parameters, each case picks one value of each with a seeded generator
+DATA_LENGTHS = (16, 64, 200, 500)
+DATA_KINDS = ("text", "numeric", "binary")
+COLUMNS = (3, 6, 10, 15)
+SECURITY_LEVELS = (2, 3, 4, 5)
+MODULE_SIZES = (2, 3, 4)
+ROTATIONS = (0.0, 0.0, 2.0, -4.0, 8.0, 180.0)
+BLUR_KERNELS = (0, 0, 3, 5)
+NOISE_SIGMAS = (0.0, 0.0, 8.0, 16.0)
+
+TEXT_CHARACTERS = string.ascii_letters + string.digits + " &,:#-.$/+%*=^;<>@[\\]_'~!|()?{}"
+
+class CorpusCase:
+    """ One benchmark image, the barcode data it holds (None for fixtures) and its generation parameters """
+
+    def __init__(self, name: str, image: np.ndarray, expected_data: bytes = None, expected_count: int = 1, params: dict = None):
+        self.name = name
+        self.image = image
+        self.expected_data = expected_data
+        self.expected_count = expected_count
+        self.params = dict() if params is None else params
+
+    @property
+    def megapixels(self) -> float:
+        return self.image.shape[0] * self.image.shape[1] / 1e6
+
+    def is_success(self, result) -> bool:
+        """ Synthetic cases must decode their data, fixtures their count of barcodes """
+        if (self.expected_data is not None):
+            return any(bytes(data) == self.expected_data for data in result.barcodes_data if (data is not None))
+
+        return len(result) >= self.expected_count
+
+def fixture_cases(tests_dir: str) -> list:
+    """ The test images as fixed cases """
+    cases = list()
+
+    for path in sorted(glob.glob(os.path.join(tests_dir, "*.png"))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        with PIL.open(path) as image:
+            pixels = np.asarray(image.convert("L"))
+        cases.append(CorpusCase("fixture/" + name, pixels, expected_count=FIXTURE_BARCODES.get(name, 1)))
+
+    return cases
+
+def random_data(generator: random.Random, kind: str, length: int) -> bytes:
+    if (kind == "numeric"):
+        return "".join(generator.choice(string.digits) for index in range(length)).encode("ascii")
+
+    if (kind == "binary"):
+        return bytes(generator.randrange(256) for index in range(length))
+
+    return "".join(generator.choice(TEXT_CHARACTERS) for index in range(length)).encode("ascii")
+
+def degrade(image: np.ndarray, angle: float, blur: int, noise: float, generator: random.Random) -> np.ndarray:
+    """ Rotate (on a white canvas large enough for the whole barcode), blur and add gaussian noise """
+    if (angle != 0.0):
+        height, width = image.shape
+        matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+        cos = abs(matrix[0, 0])
+        sin = abs(matrix[0, 1])
+        new_width = int(round(height * sin + width * cos))
+        new_height = int(round(height * cos + width * sin))
+        matrix[0, 2] += (new_width - width) / 2
+        matrix[1, 2] += (new_height - height) / 2
+        image = cv2.warpAffine(image, matrix, (new_width, new_height), flags=cv2.INTER_LINEAR, borderValue=255)
+
+    if (blur > 0):
+        image = cv2.GaussianBlur(image, (blur, blur), 0)
+
+    if (noise > 0.0):
+        noise_generator = np.random.default_rng(generator.randrange(1 << 32))
+        noisy = image.astype(np.float32) + noise_generator.normal(0.0, noise, image.shape).astype(np.float32)
+        image = np.clip(noisy, 0, 255).astype(np.uint8)
+
+    return np.ascontiguousarray(image)
+
+def synthetic_cases(seed: int = 417, count: int = 48) -> list:
+    """Seeded corpus of generated barcodes, the same seed always gives the same images
+
+    Args:
+        seed (int, optional): Random generator seed. Defaults to 417.
+        count (int, optional): Number of images. Defaults to 48.
+    """
+    generator = random.Random(seed)
+    cases = list()
+
+    for index in range(count):
+        params = {
+            "kind": generator.choice(DATA_KINDS),
+            "length": generator.choice(DATA_LENGTHS),
+            "columns": generator.choice(COLUMNS),
+            "security_level": generator.choice(SECURITY_LEVELS),
+            "module_size": generator.choice(MODULE_SIZES),
+            "rotation": generator.choice(ROTATIONS),
+            "blur": generator.choice(BLUR_KERNELS),
+            "noise": generator.choice(NOISE_SIGMAS),
+        }
+
+        data = random_data(generator, params["kind"], params["length"])
+
+        # the barcode must have 3 to 90 rows, use the closest column count that fits the data
+        for columns in sorted(range(1, 31), key=lambda columns: abs(columns - params["columns"])):
+            try:
+                image = encode_image(data, columns, params["security_level"], params["module_size"], 3, quiet_zone=8)
+                params["columns"] = columns
+                break
+            except ValueError:
+                continue
+        else:
+            raise ValueError("No column count fits {0} {1} bytes at security level {2}".format(params["length"], params["kind"], params["security_level"]))
+
+        image = degrade(image, params["rotation"], params["blur"], params["noise"], generator)
+        cases.append(CorpusCase("synthetic/{0:04d}".format(index), image, data, params=params))
+
+    return cases
@@ -0,0 +1,140 @@
+import tracemalloc
+
+import numpy as np
+
+from pdf417decoder import PDF417Decoder
+from pdf417decoder.DecodeContext import DecodeContext
+from pdf417decoder.StageTimings import StageTimings
+
+# context methods of each stage, as DecodeContext.instrument
+STAGE_METHODS = [(stage, stage) for stage in StageTimings.STAGES if (stage not in StageTimings.GENERATOR_STAGES)]
+GENERATOR_METHODS = [(stage, method) for stage, methods in StageTimings.GENERATOR_STAGES.items() for method in methods]
+
+class StagePeaks:
+    """
+        Peak traced memory above the memory in use when each stage starts.
+        Stages nest, a stage resets the tracemalloc peak and gives its own peak back to
+        the enclosing stage when it ends.
+    """
+
+    def __init__(self):
+        # stage name to peak bytes
+        self.peaks = dict()
+        # absolute peak seen so far by each running stage, outermost first
+        self._running = list()
+
+    def enter(self) -> int:
+        current, peak = tracemalloc.get_traced_memory()
+        if (len(self._running) > 0):
+            self._running[-1] = max(self._running[-1], peak)
+
+        tracemalloc.reset_peak()
+        self._running.append(current)
+        return current
+
+    def leave(self, stage: str, start: int):
+        peak = max(self._running.pop(), tracemalloc.get_traced_memory()[1])
+        self.peaks[stage] = max(self.peaks.get(stage, 0), peak - start)
+
+        if (len(self._running) > 0):
+            self._running[-1] = max(self._running[-1], peak)
+
+    def measured(self, stage: str, method):
+        def measured_method(*args, **kwargs):
+            start = self.enter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.leave(stage, start)
+
+        return measured_method
+
+    def measured_generator(self, stage: str, method):
+        def measured_method(*args, **kwargs):
+            generator = method(*args, **kwargs)
+
+            try:
+                while (True):
+                    start = self.enter()
+                    try:
+                        item = next(generator)
+                    except StopIteration:
+                        return
+                    finally:
+                        self.leave(stage, start)
+                    yield item
+            finally:
+                generator.close()
+
+        return measured_method
+
+def buffers_bytes(decoder: PDF417Decoder) -> int:
+    """ Bytes held by the idle scratch arrays of the decoder (this thread) once an image is decoded """
+    return sum(buffer.nbytes for buffer in decoder.idle_buffers().values() if (isinstance(buffer, np.ndarray)))
+
+def profile_case(decoder: PDF417Decoder, image: np.ndarray) -> dict:
+    """ Peak memory of the decode of one image, each stage and the whole decode """
+    # buffers kept from the previous image would hide the allocations of this one
+    decoder.release_buffers()
+
+    stage_peaks = StagePeaks()
+    context = DecodeContext(decoder, image)
+
+    for stage, method in STAGE_METHODS:
+        setattr(context, method, stage_peaks.measured(stage, getattr(context, method)))
+    for stage, method in GENERATOR_METHODS:
+        setattr(context, method, stage_peaks.measured_generator(stage, getattr(context, method)))
+
+    start = stage_peaks.enter()
+    result = context.decode()
+    stage_peaks.leave("decode", start)
+
+    return {"result": result, "peaks": stage_peaks.peaks, "buffers_bytes": buffers_bytes(decoder)}
+
+def run_memory_profile(cases: list) -> dict:
+    """Peak memory per stage and per megapixel of every case
+
+    Args:
+        cases (list): CorpusCase list
+
+    Returns:
+        dict: Memory report, the largest and the mean bytes per megapixel of each stage
+    """
+    if (not hasattr(tracemalloc, "reset_peak")):
+        raise RuntimeError("Memory profiling needs Python 3.9 or later (tracemalloc.reset_peak)")
+
+    decoder = PDF417Decoder()
+    # stage name to list of (peak bytes, megapixels)
+    samples = dict()
+    case_reports = list()
+
+    tracemalloc.start()
+    try:
+        for case in cases:
+            profile = profile_case(decoder, case.image)
+
+            for stage, peak in profile["peaks"].items():
+                samples.setdefault(stage, list()).append((peak, case.megapixels))
+
+            case_reports.append({"name": case.name, "success": case.is_success(profile["result"]), "megapixels": case.megapixels,
+                "peak_bytes": profile["peaks"]["decode"], "buffers_bytes": profile["buffers_bytes"]})
+    finally:
+        tracemalloc.stop()
+
+    stages = dict()
+    for stage, stage_samples in samples.items():
+        per_megapixel = [peak / megapixels for peak, megapixels in stage_samples]
+        stages[stage] = {
+            "images": len(stage_samples),
+            "peak_bytes": max(peak for peak, megapixels in stage_samples),
+            "peak_bytes_per_megapixel": max(per_megapixel),
+            "mean_bytes_per_megapixel": sum(per_megapixel) / len(per_megapixel),
+        }
+
+    # scratch buffers kept by a decoder between images, the memory of an idle worker
+    buffers_per_megapixel = [case["buffers_bytes"] / case["megapixels"] for case in case_reports]
+
+    return {"cases": len(cases), "stages": stages,
+        "buffers_bytes": max((case["buffers_bytes"] for case in case_reports), default=0),
+        "buffers_bytes_per_megapixel": max(buffers_per_megapixel, default=0.0),
+        "case_results": case_reports}
@@ -0,0 +1,56 @@
+import random
+import statistics
+import timeit
+
+from pdf417decoder import PDF417Decoder
+from pdf417decoder.DecodeContext import DecodeContext
+from pdf417decoder.Encoder import encode_image
+from pdf417decoder.Polynomial import Polynomial
+from pdf417decoder import Modulus
+
+def median_time(function, number: int, repeat: int = 9) -> float:
+    """ Median seconds per call of repeat runs of number calls, steadier than the fastest run """
+    return statistics.median(timeit.repeat(function, number=number, repeat=repeat)) / number
+
+def barcode_context() -> DecodeContext:
+    """ Context of a rendered barcode with its area located, ready for codeword scans """
+    image = encode_image(bytes(range(200)), columns=6, security_level=3, module_size=3, ratio=3, quiet_zone=4)
+    context = DecodeContext(PDF417Decoder(), image)
+    context.convert_image()
+    context.locate_barcodes()
+
+    context.barcode_area = context.barcode_list[0]
+    context.average_symbol_width = context.barcode_area.average_symbol_width
+    context.max_symbol_error = context.barcode_area.max_symbol_error
+    return context
+
+def run_micro_benchmarks(repeat: int = 9) -> dict:
+    """Seconds per call of the decoder hot paths
+
+    Args:
+        repeat (int, optional): Timing runs of each hot path, the median is kept. Defaults to 9.
+    """
+    context = barcode_context()
+    area = context.barcode_area
+
+    # a row crossing the barcode, converted to bars once
+    row = int(area.left_center_y)
+    context.scan_line(row)
+
+    # scan the left indicator codeword at the middle of the barcode once, scan_to_codeword reuses its edges
+    def get_codeword() -> int:
+        return context.get_codeword(area.left_center_x, area.left_center_y, area.left_delta_y, -area.left_delta_x)
+
+    get_codeword()
+
+    # polynomial as long as the codewords of a large barcode
+    generator = random.Random(929)
+    polynomial = Polynomial(0, 0, [generator.randrange(1, Modulus.MOD) for index in range(512)])
+    point = Modulus.exp_table[5]
+
+    return {
+        "border_signature": median_time(lambda: context.border_signature(list(), context.START_SIG, row), 5000, repeat),
+        "get_codeword": median_time(get_codeword, 5000, repeat),
+        "scan_to_codeword": median_time(context.scan_to_codeword, 5000, repeat),
+        "evaluate_at": median_time(lambda: polynomial.evaluate_at(point), 500, repeat),
+    }
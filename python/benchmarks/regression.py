@@ -0,0 +1,128 @@
+import json
+import time
+
+import numpy as np
+
+# stages shorter than this in the whole corpus are reported but too noisy to gate
+MIN_GATED_SECONDS = 0.01
+
+# allowed slow down of the micro-benchmarks, single calls of a few microseconds are noisier than whole decodes
+MICRO_TOLERANCE = 0.5
+
+def calibrate(repeat: int = 5) -> float:
+    """
+        Seconds of a fixed workload mixing interpreted loops and small NumPy calls like the decoder,
+        the fastest of repeat runs. Benchmark times divided by it compare across machines.
+    """
+    generator = np.random.default_rng(417)
+    array = generator.integers(0, 256, 4096, dtype=np.int64)
+    best = None
+
+    for index in range(repeat):
+        start = time.perf_counter()
+
+        total = 0
+        for value in range(200000):
+            total += (value * 7 + (value >> 3)) % 929
+
+        for value in range(500):
+            total += int(np.sort(array)[value % 4096])
+
+        seconds = time.perf_counter() - start
+        if (best is None or seconds < best):
+            best = seconds
+
+    return best
+
+def normalize(report: dict) -> dict:
+    """ Machine independent costs of a benchmark report (lower is better), in calibration units """
+    calibration = report["calibration_seconds"]
+    metrics = {"seconds_per_decode": report["seconds"] / report["cases"] / calibration}
+
+    for stage, timing in report["stages"].items():
+        metrics["stage/" + stage] = timing["seconds"] / report["cases"] / calibration
+
+    for name, seconds in report.get("micro", dict()).items():
+        metrics["micro/" + name] = seconds / calibration
+
+    return metrics
+
+def make_baseline(report: dict) -> dict:
+    """ Baseline to commit: the corpus parameters and the normalized costs """
+    return {
+        "seed": report["seed"],
+        "count": report["count"],
+        "fixtures": report["fixtures"],
+        "repeat": report["repeat"],
+        "python": report["python"],
+        # gated metrics, stages too short to time reliably are left out
+        "metrics": {metric: cost for metric, cost in normalize(report).items()
+            if (not metric.startswith("stage/") or report["stages"][metric[6:]]["seconds"] >= MIN_GATED_SECONDS)},
+        "success_rate": report["success_rate"],
+        "succeeded": sorted(case["name"] for case in report["case_results"] if (case["success"])),
+    }
+
+def load_baseline(path: str) -> dict:
+    with open(path) as baseline_file:
+        return json.load(baseline_file)
+
+def save_baseline(path: str, report: dict):
+    with open(path, "w") as baseline_file:
+        json.dump(make_baseline(report), baseline_file, indent=2, sort_keys=True)
+        baseline_file.write("\n")
+
+def compare(baseline: dict, report: dict, tolerance: float, micro_tolerance: float = MICRO_TOLERANCE) -> list:
+    """Compare a report with a baseline
+
+    Costs may grow by the tolerance, the success rate and the success of each case must not drop.
+    Baseline metrics and cases missing from the report are regressions.
+
+    Args:
+        baseline (dict): Baseline made by make_baseline
+        report (dict): Benchmark report of the same corpus
+        tolerance (float): Allowed slow down, 0.25 is 25% slower
+        micro_tolerance (float, optional): Allowed slow down of the micro-benchmarks. Defaults to MICRO_TOLERANCE.
+
+    Returns:
+        list: (metric, baseline value, current value, change, regressed), current value and change are None if missing
+    """
+    current = normalize(report)
+    rows = list()
+
+    for metric in sorted(baseline["metrics"]):
+        if (metric not in current):
+            rows.append((metric, baseline["metrics"][metric], None, None, True))
+            continue
+
+        allowed = micro_tolerance if (metric.startswith("micro/")) else tolerance
+        change = current[metric] / baseline["metrics"][metric] - 1.0
+        rows.append((metric, baseline["metrics"][metric], current[metric], change, change > allowed))
+
+    if ("success_rate" in baseline):
+        change = report["success_rate"] - baseline["success_rate"]
+        rows.append(("success_rate", baseline["success_rate"], report["success_rate"], change, change < 0.0))
+
+    # cases decoded by the baseline and not by this run
+    success = {case["name"]: case["success"] for case in report["case_results"]}
+    for name in baseline.get("succeeded", ()):
+        if (success.get(name) is None):
+            rows.append(("case/" + name, 1.0, None, None, True))
+        elif (not success[name]):
+            rows.append(("case/" + name, 1.0, 0.0, -1.0, True))
+
+    return rows
+
+def format_comparison(rows: list, tolerance: float, micro_tolerance: float = MICRO_TOLERANCE) -> str:
+    lines = ["{0:<28} {1:>12} {2:>12} {3:>8}".format("metric", "baseline", "current", "change")]
+
+    for metric, baseline_value, current_value, change, regressed in rows:
+        if (current_value is None):
+            lines.append("{0:<28} {1:>12.4f} {2:>12} {3:>8}  MISSING".format(metric, baseline_value, "-", "-"))
+        else:
+            lines.append("{0:<28} {1:>12.4f} {2:>12.4f} {3:>+7.1%}{4}".format(metric, baseline_value, current_value, change,
+                "  REGRESSION" if regressed else ""))
+
+    regressions = sum(1 for row in rows if (row[4]))
+    lines.append("{0} of {1} checks failed (costs {2:.0%}, micro-benchmarks {3:.0%} tolerance, no success drop)".format(
+        regressions, len(rows), tolerance, micro_tolerance))
+    return "\n".join(lines)
@@ -0,0 +1,163 @@
+import asyncio
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from pdf417decoder.Decoder import PDF417Decoder
+from pdf417decoder.DecodeResult import DecodeResult
+from pdf417decoder.ImageSource import load_image, transport_image
+from pdf417decoder.ResultRecord import record_to_result, result_to_record
+
+# decoder of the current process when decoding in a process executor, and its options
+_process_decoder = None
+_process_options = None
+
+def decoder_options(decoder: PDF417Decoder) -> tuple:
+    """ Options a process worker needs to decode as the decoder does (caches and callbacks stay in the caller) """
+    return (decoder.verify_only, decoder.max_barcodes, decoder.time_budget, decoder.record_timings, decoder.record_counters)
+
+def _decode_in_process(source, options: tuple) -> tuple:
+    """ Decode one image in a process executor worker, the decoder is created once per worker and options """
+    global _process_decoder, _process_options
+    if (_process_decoder is None or _process_options != options):
+        verify_only, max_barcodes, time_budget, timings, counters = options
+        _process_decoder = PDF417Decoder(verify_only=verify_only, max_barcodes=max_barcodes, time_budget=time_budget,
+            timings=timings, counters=counters)
+        _process_options = options
+
+    return result_to_record(_process_decoder.decode_image(load_image(source)))
+
+def _decode_in_thread(decoder: PDF417Decoder, source) -> DecodeResult:
+    return decoder.decode_image(load_image(source))
+
+def _submit(executor: Executor, decoder: PDF417Decoder, source) -> Future:
+    """
+        Submit one decode, process workers get a picklable image and the decoder options,
+        they keep their own decoder and return a result record
+    """
+    if (isinstance(executor, ProcessPoolExecutor)):
+        return executor.submit(_decode_in_process, transport_image(source), decoder_options(decoder))
+
+    return executor.submit(_decode_in_thread, decoder, source)
+
+def _to_result(value) -> DecodeResult:
+    """ Result of a thread job, or of the record of a process job """
+    return record_to_result(value) if (isinstance(value, tuple)) else value
+
+def _run_in_executor(executor: Executor, decoder: PDF417Decoder, source) -> asyncio.Future:
+    """ Decode in an executor, None is the event loop default executor """
+    if (executor is None):
+        return asyncio.get_running_loop().run_in_executor(None, _decode_in_thread, decoder, source)
+
+    return asyncio.wrap_future(_submit(executor, decoder, source))
+
+class AsyncDecoder:
+    """
+        Decode images from asyncio code without blocking the event loop.
+        Decodes run in an executor and the number of decodes in flight is capped,
+        callers wait for a free slot (backpressure). A cancelled or timed out
+        decode returns at once. If the executor has not started it the job is cancelled
+        and its slot freed, otherwise it keeps its slot until the executor finishes the image,
+        so abandoned decodes cannot pile up in the executor queue.
+    """
+
+    def __init__(self, decoder: PDF417Decoder = None, executor: Executor = None, max_concurrency: int = 4):
+        """
+        Args:
+            decoder (PDF417Decoder, optional): Shared decoder. Defaults to a new decoder. Process workers
+                decode with its options (verify only, max barcodes, time budget, timings, counters),
+                its caches and timings callback are only used by thread executors.
+            executor (Executor, optional): Thread or process executor. Defaults to a thread pool
+                of max_concurrency threads owned by this object.
+            max_concurrency (int, optional): Maximum decodes in flight. Defaults to 4.
+        """
+        self.decoder = PDF417Decoder() if decoder is None else decoder
+        self.max_concurrency = max_concurrency
+        self._own_executor = executor is None
+        self.executor = ThreadPoolExecutor(max_concurrency) if executor is None else executor
+        self._semaphore = None
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        """ Number of decodes holding a slot, running in the executor or waiting in its queue """
+        return self._in_flight
+
+    async def decode(self, source, timeout: float = None) -> DecodeResult:
+        """Decode one image
+
+        Args:
+            source: Image file path, encoded image bytes, PIL image or NumPy array
+            timeout (float, optional): Seconds to wait for the result, including the wait for a slot.
+
+        Raises:
+            asyncio.TimeoutError: The result was not available in time
+        """
+        if (timeout is None):
+            return await self._decode(source)
+
+        return await asyncio.wait_for(self._decode(source), timeout)
+
+    async def _decode(self, source) -> DecodeResult:
+        # semaphore is created on first use so it belongs to the running event loop
+        if (self._semaphore is None):
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        await self._semaphore.acquire()
+        try:
+            job = _submit(self.executor, self.decoder, source)
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+        # the slot follows the executor job, not the caller that may give up on it
+        self._in_flight += 1
+        loop = asyncio.get_running_loop()
+        job.add_done_callback(lambda job: self._job_done(loop))
+
+        try:
+            return _to_result(await asyncio.wrap_future(job))
+        except asyncio.CancelledError:
+            # a job still queued is dropped at once, a running job can not be stopped
+            job.cancel()
+            raise
+
+    def _job_done(self, loop: asyncio.AbstractEventLoop):
+        """ Free the slot of a finished or cancelled job, called from the executor thread """
+        try:
+            loop.call_soon_threadsafe(self._release_slot)
+        except RuntimeError:
+            # event loop already closed, nobody waits for a slot
+            pass
+
+    def _release_slot(self):
+        self._in_flight -= 1
+        self._semaphore.release()
+
+    def close(self):
+        """ Shut down the executor if this object created it """
+        if (self._own_executor):
+            self.executor.shutdown(wait=False)
+
+    async def __aenter__(self) -> 'AsyncDecoder':
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+async def decode_async(source, decoder: PDF417Decoder = None, executor: Executor = None, timeout: float = None) -> DecodeResult:
+    """Decode one image in an executor without blocking the event loop
+
+    Args:
+        source: Image file path, encoded image bytes, PIL image or NumPy array
+        decoder (PDF417Decoder, optional): Shared decoder. Defaults to a new decoder.
+        executor (Executor, optional): Executor. Defaults to the event loop default executor.
+        timeout (float, optional): Seconds to wait for the result.
+    """
+    if (decoder is None):
+        decoder = PDF417Decoder()
+
+    future = _run_in_executor(executor, decoder, source)
+
+    if (timeout is None):
+        return _to_result(await future)
+
+    return _to_result(await asyncio.wait_for(future, timeout))
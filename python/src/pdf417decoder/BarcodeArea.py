@@ -116,4 +116,11 @@ class BarcodeArea:
 
     def right_x_func_y(self, posY: int) -> int:
         return int(self.right_center_x + (self.right_delta_x * (posY - self.right_center_y)) / self.right_delta_y)
-    
\ No newline at end of file
+    
+
+    def translate(self, delta_x: int, delta_y: int):
+        """ Move the border lines, used to map an area found in an image window to the full image """
+        self.left_center_x += delta_x
+        self.left_center_y += delta_y
+        self.right_center_x += delta_x
+        self.right_center_y += delta_y
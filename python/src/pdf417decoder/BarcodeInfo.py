@@ -1,3 +1,7 @@
+from pdf417decoder.ErrorCorrection import ErrorCorrectionStatus
+from pdf417decoder.MacroBlock import MacroBlock
+from pdf417decoder.DecodeCounters import DecodeCounters
+
 class BarcodeInfo:
     """Barcode results extra information"""
 
@@ -93,3 +97,33 @@ class BarcodeInfo:
     @error_correction_count.setter
     def error_correction_count(self, value: int):    
         self._error_correction_count = value
+
+    @property
+    def error_correction_status(self) -> ErrorCorrectionStatus:
+        """ Error correction status (clean, corrected, errors detected or uncorrectable) """
+        return self._error_correction_status
+
+    @error_correction_status.setter
+    def error_correction_status(self, value: ErrorCorrectionStatus):    
+        self._error_correction_status = value
+
+    @property
+    def macro_block(self) -> MacroBlock:
+        """ Macro PDF417 control block or None """
+        return self._macro_block
+
+    @macro_block.setter
+    def macro_block(self, value: MacroBlock):    
+        self._macro_block = value
+
+    @property
+    def counters(self) -> DecodeCounters:
+        """ Codeword scan and error correction event counts of this barcode, None unless the decoder counts them """
+        return self._counters
+
+    @counters.setter
+    def counters(self, value: DecodeCounters):
+        self._counters = value
+
+    def __init__(self):
+        self.counters = None
@@ -0,0 +1,1611 @@
+from math import sqrt
+import math
+import operator
+import numpy as np
+import cv2
+import time
+from enum import Enum, IntEnum, auto
+from PIL import Image as PIL
+from typing import Iterator, Tuple
+
+import pdf417decoder.Modulus
+import pdf417decoder.Polynomial
+import pdf417decoder.StaticTables
+import pdf417decoder.ErrorCorrection
+from pdf417decoder.BarcodeInfo import BarcodeInfo
+from pdf417decoder.BarcodeArea import BarcodeArea
+from pdf417decoder.BorderPattern import BorderPattern
+from pdf417decoder.BorderSymbol import BorderSymbol
+from pdf417decoder.ErrorCorrection import ErrorCorrectionStatus
+from pdf417decoder.Segment import Segment, SegmentType
+from pdf417decoder.MacroBlock import MacroBlock
+from pdf417decoder.DecodeResult import DecodeResult
+from pdf417decoder.ResultCache import CachedCodewords, codewords_key
+from pdf417decoder.StageTimings import StageTimings
+from pdf417decoder.DecodeCounters import DecodeCounters
+
+class EncodingMode(Enum):
+    BYTE = auto()
+    TEXT = auto()
+    NUMERIC = auto()
+
+class TextEncodingMode(IntEnum):
+    UPPER = pdf417decoder.StaticTables.TEXT_UPPER
+    LOWER = pdf417decoder.StaticTables.TEXT_LOWER
+    MIXED = pdf417decoder.StaticTables.TEXT_MIXED
+    PUNCT = pdf417decoder.StaticTables.TEXT_PUNCT
+    SHIFT_UPPER = pdf417decoder.StaticTables.TEXT_SHIFT_UPPER
+    SHIFT_PUNCT_UPPER = pdf417decoder.StaticTables.TEXT_SHIFT_PUNCT_UPPER
+    SHIFT_PUNCT_LOWER = pdf417decoder.StaticTables.TEXT_SHIFT_PUNCT_LOWER
+    SHIFT_PUNCT_MIXED = pdf417decoder.StaticTables.TEXT_SHIFT_PUNCT_MIXED
+
+def scratch_buffer(buffers: dict, name: str, shape: tuple, dtype: type) -> np.ndarray:
+    """ Scratch array of the given shape kept in buffers, the underlying buffer only grows """
+    size = 1
+    for dimension in shape:
+        size *= dimension
+
+    buffer = buffers.get(name)
+
+    if (buffer is None or buffer.size < size or buffer.dtype != dtype):
+        buffer = np.empty(size, dtype=dtype)
+        buffers[name] = buffer
+
+    return buffer[:size].reshape(shape)
+
+def binarize_image(input_image: PIL.Image, buffers: dict, reuse_matrix: bool = True) -> np.ndarray:
+    """Convert image to black and white boolean matrix (True is black)
+
+    Args:
+        input_image (Image): Barcode image bitmap or array
+        buffers (dict): Scratch buffers of the current thread
+        reuse_matrix (bool, optional): Return the matrix in a scratch buffer, pass False
+            to allocate a matrix that outlives the next call. Defaults to True.
+    """
+    np_image = np.asarray(input_image)
+    height, width = np_image.shape[:2]
+
+    if (len(np_image.shape) > 2):
+        gray = scratch_buffer(buffers, "gray", (height, width), np.uint8)
+        cv2.cvtColor(np_image, cv2.COLOR_BGR2GRAY, dst=gray)
+    else:
+        gray = np_image
+
+    black_white = scratch_buffer(buffers, "black_white", (height, width), np.uint8)
+    cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=black_white)
+    
+    # padding with single white line at the leftmost of the image
+    padding = 1 if (black_white[:, 0] != 255).any() else 0
+
+    # Save the final cleaned up black and white image.
+    #PIL.fromarray(black_white).save("black_and_white.png")
+
+    if (reuse_matrix):
+        image_matrix = scratch_buffer(buffers, "image_matrix", (height, width + padding), bool)
+    else:
+        image_matrix = np.empty((height, width + padding), dtype=bool)
+
+    image_matrix[:, :padding] = False
+    np.not_equal(black_white, 255, out=image_matrix[:, padding:])
+
+    return image_matrix
+
+class DecodeContext:
+    """
+        State of one decode call.
+        A new context is created for every image so one decoder can be shared by many threads.
+    """
+
+    # Width of Symbol in Bars
+    MODULES_IN_CODEWORD = 17
+
+    # Control codewords
+    SWITCH_TO_TEXT_MODE = 900
+    SWITCH_TO_BYTE_MODE = 901
+    SWITCH_TO_NUMERIC_MODE = 902
+    SHIFT_TO_BYTE_MODE = 913
+    SWITCH_TO_BYTE_MODE_FOR_SIX = 924
+
+    #  User-Defined GLis:
+    # Codeword 925 followed by one codeword
+    # The program allows for value of 0 to 899.
+    # The documentation is not clear one codeword
+    # cannot be 810,900 to 811,799.
+    # (GLI values from 810,900 to 811,799). These GLis
+    # should be used for closed-system applications
+    GLI_USER_DEFINED = 925
+
+    # General Purpose GLis:
+    # Codeword 926 followed by two codewords
+    # representing GLI values from 900 to 810,899
+    GLI_GENERAL_PURPOSE = 926
+
+    # international character set
+    # Codeword 927 followed by a single codeword
+    # with a value ranging from O to 899. The GLI
+    # value of 0 is the default interpretation
+    # This value is probably ISO 8859 part number
+    GLI_CHARACTER_SET = 927
+
+    # Macro PDF417 control block:
+    # Codeword 928 followed by the segment index (two numeric
+    # compaction codewords), the file ID codewords and optional fields.
+    # Codeword 923 followed by a field designator starts an optional field
+    # Codeword 922 terminates the control block of the last segment
+    MACRO_CONTROL_BLOCK = 928
+    MACRO_OPTIONAL_FIELD = 923
+    MACRO_TERMINATOR = 922
+
+    START_SIG = [9, 2, 2, 2, 2, 2]
+    STOP_SIG = [8, 2, 4, 4, 2, 2]
+
+    Y_STEP = [1, -1, 2, -2, 3, -3]
+
+    # a border symbols list ends when no symbol is found in this many rows
+    CLOSED_BORDER_GAP = 18
+
+    # Byte compaction block of 5 codewords is a base 900 number of 6 bytes
+    BYTE_BLOCK_POWERS = np.array([900 ** 4, 900 ** 3, 900 ** 2, 900, 1], dtype=np.uint64)
+    BYTE_BLOCK_SHIFTS = np.array([40, 32, 24, 16, 8, 0], dtype=np.uint64)
+
+    # Numeric compaction block of up to 15 codewords is a base 900 number
+    # Powers of 900 in descending order for each block length
+    NUMERIC_BLOCK_POWERS = [[900 ** index for index in range(length - 1, -1, -1)] for length in range(16)]
+
+    def __init__(self, decoder: 'PDF417Decoder', input_image: PIL.Image, image_matrix: np.ndarray = None, barcode_list: list = None, deadline: float = None):
+        """
+        Args:
+            decoder (PDF417Decoder): Decoder options and idle scratch buffers
+            input_image (Image): Barcode image bitmap or array
+            image_matrix (ndarray, optional): Image already converted by binarize_image,
+                input_image is not used when it is given.
+            barcode_list (list, optional): Barcode areas known from a previous image,
+                the image is not scanned for barcodes when it is given.
+            deadline (float, optional): time.monotonic() time the decode must end by.
+                Defaults to now plus the decoder time budget, if any.
+        """
+        self.decoder = decoder
+        self.input_image = input_image
+        self.image_matrix = image_matrix
+        self.barcode_list = barcode_list
+        self.rotated = False
+        # barcode area and indicator corners of each decoded barcode
+        self.barcodes_geometry = list()
+        self.verify_only = decoder.verify_only
+        self.max_barcodes = decoder.max_barcodes
+        self.codeword_cache = decoder.codeword_cache
+        if (deadline is None and decoder.time_budget is not None):
+            deadline = time.monotonic() + decoder.time_budget
+        self.deadline = deadline
+        self.timed_out = False
+        # scratch buffers borrowed from the decoder on first use, returned when the decode ends
+        self._buffers = None
+        self.scan_x = np.zeros((9), dtype = int)
+        self.scan_y = np.zeros((9), dtype = int)
+        self.barcodes_info = list()
+
+        # stage timings, methods are only wrapped when the decoder records them
+        self.timings = None
+        if (decoder.record_timings):
+            self.instrument()
+
+        # image and current barcode event counters, also only counted on request
+        self.counters = None
+        self.barcode_counters = None
+        if (decoder.record_counters):
+            self.instrument_counters()
+
+    def instrument(self):
+        """ Wrap the decode stages of this context to record their wall time and call count """
+        self.timings = StageTimings()
+
+        for stage in StageTimings.STAGES:
+            methods = StageTimings.GENERATOR_STAGES.get(stage)
+
+            if (methods is None):
+                setattr(self, stage, self.timings.timed(stage, getattr(self, stage)))
+            else:
+                for method in methods:
+                    setattr(self, method, self.timings.timed_generator(stage, getattr(self, method)))
+
+        # report the timings once the image is done, even if the consumer stops early.
+        # Decodes of parts of an image (tiles) clear timings_callback and report the image once
+        decode_segments = self.decode_segments
+        self.timings_callback = self.decoder.timings_callback
+
+        def reported_segments() -> Iterator[Segment]:
+            try:
+                yield from decode_segments()
+            finally:
+                if (self.timings_callback is not None):
+                    self.timings_callback(self.timings)
+
+        self.decode_segments = reported_segments
+
+    def instrument_counters(self):
+        """ Wrap the hot path methods of this context to count their events """
+        self.counters = DecodeCounters()
+        counters = self.counters
+        # counters of every barcode tried, added to the image counters at the end
+        tried_counters = list()
+
+        scan_line = self.scan_line
+        find_border_symbols = self.find_border_symbols
+        add_border_symbol = self.add_border_symbol
+        remove_short_lists = self.remove_short_lists
+        match_start_and_stop = self.match_start_and_stop
+        left_indicators = self.left_indicators
+        get_codeword = self.get_codeword
+        rev_get_codeword = self.rev_get_codeword
+        data_codeword = self.data_codeword
+        find_symbol = self.find_symbol
+        error_correction = self.error_correction
+        decode_segments = self.decode_segments
+
+        def counted_scan_line(row: int) -> bool:
+            counters.rows_scanned += 1
+            return scan_line(row)
+
+        def counted_find_border_symbols(signature: list, row: int) -> list:
+            # one window every two bars of the scanned line
+            counters.signature_windows += max(0, (self.bar_end - 7) // 2)
+            return find_border_symbols(signature, row)
+
+        def counted_add_border_symbol(border_symbols: list, new_symbol: BorderSymbol, row: int):
+            lists_count = len(border_symbols)
+            add_border_symbol(border_symbols, new_symbol, row)
+            counters.border_lists_created += len(border_symbols) - lists_count
+
+        def counted_remove_short_lists(border_symbols: list):
+            lists_count = len(border_symbols)
+            remove_short_lists(border_symbols)
+            counters.border_lists_discarded += lists_count - len(border_symbols)
+
+        def counted_match_start_and_stop(start_list: list, stop_list: list) -> bool:
+            counters.candidate_pairs += 1
+            return match_start_and_stop(start_list, stop_list)
+
+        def counted_left_indicators() -> bool:
+            # first stage of every barcode
+            self.barcode_counters = DecodeCounters()
+            tried_counters.append(self.barcode_counters)
+            return left_indicators()
+
+        def counted_get_codeword(left_x: int, left_y: int, delta_x: int, delta_y: int) -> int:
+            self.barcode_counters.get_codeword_calls += 1
+            return get_codeword(left_x, left_y, delta_x, delta_y)
+
+        def counted_rev_get_codeword(right_x: int, right_y: int, delta_x: int, delta_y: int) -> int:
+            self.barcode_counters.get_codeword_calls += 1
+            return rev_get_codeword(right_x, right_y, delta_x, delta_y)
+
+        def counted_data_codeword(data_matrix_x: int, data_matrix_y: int) -> int:
+            barcode_counters = self.barcode_counters
+            calls = barcode_counters.get_codeword_calls
+            codeword = data_codeword(data_matrix_x, data_matrix_y)
+
+            # every get_codeword call after the first one is a Y_STEP retry
+            barcode_counters.y_step_retries += barcode_counters.get_codeword_calls - calls - 1
+            if (codeword < 0):
+                barcode_counters.erasures += 1
+            return codeword
+
+        def counted_find_symbol(array, element) -> int:
+            symbol = find_symbol(array, element)
+            if (symbol < 0):
+                self.barcode_counters.symbol_misses += 1
+            return symbol
+
+        def counted_error_correction() -> bool:
+            corrected = error_correction()
+            self.barcode_counters.errors_corrected += self.error_correction_count
+            return corrected
+
+        def counted_segments() -> Iterator[Segment]:
+            try:
+                yield from decode_segments()
+            finally:
+                for barcode_counters in tried_counters:
+                    counters.merge(barcode_counters)
+
+        self.scan_line = counted_scan_line
+        self.find_border_symbols = counted_find_border_symbols
+        self.add_border_symbol = counted_add_border_symbol
+        self.remove_short_lists = counted_remove_short_lists
+        self.match_start_and_stop = counted_match_start_and_stop
+        self.left_indicators = counted_left_indicators
+        self.get_codeword = counted_get_codeword
+        self.rev_get_codeword = counted_rev_get_codeword
+        self.data_codeword = counted_data_codeword
+        self.find_symbol = counted_find_symbol
+        self.error_correction = counted_error_correction
+        self.decode_segments = counted_segments
+
+    def decode(self) -> DecodeResult:
+        """Decode the image"""
+        for segment in self.decode_segments():
+            pass
+
+        result = DecodeResult()
+        result.barcodes_info = self.barcodes_info
+        result.timed_out = self.timed_out
+        result.timings = self.timings
+        result.counters = self.counters
+        return result
+
+    def decode_segments(self) -> Iterator[Segment]:
+        """Decode the image, yielding data segments while the codewords are converted
+
+        Segments of all barcodes are yielded in order and tagged with the barcode index.
+        Segment data is a view over the conversion buffer of the barcode, barcode_data is a copy of it.
+        Segments of a barcode that turns out to have invalid data are not retracted.
+        barcodes_info is set once all barcodes are decoded.
+
+        Yields:
+            Segment: Text, byte, numeric or global label identifier segment
+        """
+        try:
+            yield from self.decode_barcodes()
+        finally:
+            self.return_buffers()
+
+    def decode_barcodes(self) -> Iterator[Segment]:
+        """ Locate and decode all barcodes, the body of decode_segments """
+        if (not self.convert_image()):
+            return
+
+        if (self.barcode_list is None and not self.locate_barcodes()):
+            return
+
+        # results list
+        barcodes_info = list()
+        
+        # loop for all barcodes found
+        for barcode_area in self.barcode_list:
+            if (self.max_barcodes is not None and len(barcodes_info) >= self.max_barcodes):
+                break
+
+            # out of time, keep the barcodes decoded so far
+            if (self.expired()):
+                break
+
+            self.barcode_area = barcode_area
+            
+            # reset all barcode variables
+            self.ind_control = 0
+            self.data_rows = 0
+            self.data_columns = 0
+            self.error_correction_length = 0
+            self.error_correction_count = 0
+            self.error_correction_status = None
+            self.cached_codewords = None
+            self.barcode_binary_data = None
+            self.macro_block = None
+            self.global_label_id_character_set = None
+            self.global_label_id_character_set_number = None
+            self.global_label_id_general_purpose = None
+            self.global_label_id_user_defined = None
+            
+            self.average_symbol_width = barcode_area.average_symbol_width
+            self.max_symbol_error = barcode_area.max_symbol_error
+
+            if (not self.left_indicators()):
+                continue
+            
+            if (not self.right_indicators()):
+                continue
+            
+            if (not self.set_trans_matrix()):
+                continue
+            
+            if (not self.get_codewords()):
+                continue
+
+            # same raw codewords as a barcode decoded before
+            if (self.cached_codewords is not None):
+                yield from self.cached_segments(len(barcodes_info))
+
+            # in verify only mode codewords with errors are reported without data
+            elif (self.codeword_cache is not None and not self.verify_only):
+                try:
+                    yield from self.cache_segments(len(barcodes_info))
+                except ValueError:
+                    continue
+
+            elif (self.error_correction_status == ErrorCorrectionStatus.CLEAN or not self.verify_only):
+                # convert codewords to bytes and text
+                try:
+                    yield from self.codewords_to_segments(len(barcodes_info))
+                except ValueError:
+                    continue
+            
+            result = BarcodeInfo()
+            result.barcode_data = self.barcode_binary_data
+            result.character_set = self.global_label_id_character_set
+            result.gli_character_set_number = self.global_label_id_character_set_number
+            result.gli_general_purpose = self.global_label_id_general_purpose
+            result.gli_user_defined = self.global_label_id_user_defined
+            result.data_columns = self.data_columns
+            result.data_rows = self.data_rows
+            result.error_correction_length = self.error_correction_length
+            result.error_correction_count = self.error_correction_count
+            result.error_correction_status = self.error_correction_status
+            result.macro_block = self.macro_block
+            result.counters = self.barcode_counters
+            barcodes_info.append(result)
+
+            self.barcodes_geometry.append((barcode_area, self.corners()))
+
+        self.barcodes_info = barcodes_info
+
+    def expired(self) -> bool:
+        """ Deadline check at loop boundaries, once expired the decode winds down with partial results """
+        if (self.deadline is not None and not self.timed_out and time.monotonic() >= self.deadline):
+            self.timed_out = True
+
+        return self.timed_out
+
+    def corners(self) -> tuple:
+        """ Top left, top right, bottom left and bottom right indicator codewords positions of the current barcode """
+        return ((self.top_left_x, self.top_left_y), (self.top_right_x, self.top_right_y),
+            (self.bottom_left_x, self.bottom_left_y), (self.bottom_right_x, self.bottom_right_y))
+
+    @property
+    def buffers(self) -> dict:
+        """ Scratch buffers owned by this context until the decode ends """
+        if (self._buffers is None):
+            self._buffers = self.decoder.borrow_buffers()
+
+        return self._buffers
+
+    def return_buffers(self):
+        """ Give the scratch buffers back to the decoder for the next decode of this thread """
+        if (self._buffers is not None):
+            self.decoder.return_buffers(self._buffers)
+            self._buffers = None
+
+    def __enter__(self) -> 'DecodeContext':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """ Contexts used without decode_segments (scans of parts of an image) return their buffers on exit """
+        self.return_buffers()
+
+    def scratch_buffer(self, name: str, shape: tuple, dtype: type) -> np.ndarray:
+        """ Scratch array of the given shape, the underlying buffer only grows """
+        return scratch_buffer(self.buffers, name, shape, dtype)
+
+    def locate_barcodes(self) -> bool:
+        self.prepare_scan()
+        self.barcode_list = list()
+
+        self.scan_image()
+
+        # rotate image by 180 degrees and try again
+        if (len(self.barcode_list) == 0 and not self.timed_out):
+            self.rescan_rotated()
+
+        return len(self.barcode_list) > 0
+
+    def scan_image(self):
+        """ Scan the image rows for start and stop borders and match them into barcode areas """
+        start_symbols = list()
+        stop_symbols = list()
+
+        for row in range(self.image_height):
+            # out of time, match the borders found so far
+            if (self.expired()):
+                break
+
+            # stop scanning once enough barcodes are found
+            if (self.max_barcodes is not None and row % self.CLOSED_BORDER_GAP == 0 and self.count_closed_pairs(start_symbols, stop_symbols, row) >= self.max_barcodes):
+                break
+
+            # scan the line for array of bars
+            if (not self.scan_line(row)):
+                continue
+
+            #look for start signature
+            self.border_signature(start_symbols, self.START_SIG, row)
+            self.border_signature(stop_symbols, self.STOP_SIG, row)
+
+        self.remove_short_lists(start_symbols)
+        self.remove_short_lists(stop_symbols)
+
+        # match start and stop patterns
+        if (len(start_symbols) != 0 and len(stop_symbols) != 0):
+            for start_list in start_symbols:
+                for stop_list in stop_symbols:
+                    self.match_start_and_stop(start_list, stop_list)
+
+    def remove_short_lists(self, border_symbols: list):
+        """ Remove all lists with less than 18 symbols """
+        border_symbols[:] = [symbols for symbols in border_symbols if (len(symbols) >= 18)]
+
+    def rescan_rotated(self):
+        """ Rotate image by 180 degrees and scan it again """
+        self.rotate_image_by_180()
+        self.scan_image()
+
+    def prepare_scan(self):
+        """ Bar positions buffer of scan_line """
+        # there are at most image width bars in a row
+        self.bar_pos = self.buffers.get("bar_pos")
+        if (self.bar_pos is None or len(self.bar_pos) < self.image_width):
+            self.bar_pos = list([0] * self.image_width)
+            self.buffers["bar_pos"] = self.bar_pos
+
+    def row_border_symbols(self, row: int) -> Tuple[list, list]:
+        """ Start and stop symbols found in one image row, prepare_scan must be called first """
+        if (not self.scan_line(row)):
+            return list(), list()
+
+        return self.find_border_symbols(self.START_SIG, row), self.find_border_symbols(self.STOP_SIG, row)
+
+    def count_closed_pairs(self, start_symbols: list, stop_symbols: list, row: int) -> int:
+        """ Count matching start and stop borders that can not grow any more (no symbol in the last rows) """
+        closed_start = [symbols for symbols in start_symbols if (len(symbols) >= 18 and row - symbols[-1].y1 >= self.CLOSED_BORDER_GAP)]
+        closed_stop = [symbols for symbols in stop_symbols if (len(symbols) >= 18 and row - symbols[-1].y1 >= self.CLOSED_BORDER_GAP)]
+
+        if (len(closed_start) == 0 or len(closed_stop) == 0):
+            return 0
+
+        # trial matches, the class method so counters do not take them for candidate pairs
+        for start_list in closed_start:
+            for stop_list in closed_stop:
+                DecodeContext.match_start_and_stop(self, start_list, stop_list)
+
+        count = len(self.barcode_list)
+        self.barcode_list.clear()
+        return count
+
+    def rotate_image_by_180(self):
+        """ Rotate image by 180 degrees """
+        rev_image_matrix = self.scratch_buffer("rotated", (self.image_height, self.image_width), bool)
+        np.copyto(rev_image_matrix, self.image_matrix[::-1, ::-1])
+        self.image_matrix = rev_image_matrix
+        self.rotated = not self.rotated
+
+    def scan_line(self, row: int) -> bool:
+        """Convert image line to black and white bars"""
+        
+        row_data = self.image_matrix[row]
+        transitions = self.scratch_buffer("transitions", (self.image_width - 1,), bool)
+        np.not_equal(row_data[1:], row_data[:-1], out=transitions)
+
+        # each bar ends at a color transition or at the end of the line
+        bar_ends = np.flatnonzero(transitions)
+        self.bar_end = len(bar_ends) + 1
+        self.bar_pos[:self.bar_end - 1] = (bar_ends + 1).tolist()
+        self.bar_pos[self.bar_end - 1] = self.image_width
+
+        return self.bar_end > 8
+
+    def border_signature(self, border_symbols: list, signature: list, row: int):
+        for new_symbol in self.find_border_symbols(signature, row):
+            self.add_border_symbol(border_symbols, new_symbol, row)
+
+    def find_border_symbols(self, signature: list, row: int) -> list:
+        """ Start or stop symbols in the bars of the last scanned line """
+        symbols = list()
+
+        # search for start or stop signature
+        bar_ptr_end = self.bar_end - 8
+
+        for bar_ptr in range(0, bar_ptr_end, 2):
+            # width of 8 bars
+            width = self.bar_pos[bar_ptr + 8] - self.bar_pos[bar_ptr]
+
+            # test for signature
+            index = 0
+            for i in range(6):
+                index = i
+                calc = (34 * (self.bar_pos[bar_ptr + index + 2] - self.bar_pos[bar_ptr + index]) + width) / (2 * width)
+                calc_int = int(calc)
+                if (calc_int != signature[index]):
+                    break
+                index += 1
+
+            # no start or stop signature
+            if (index < 6):
+                continue
+
+            symbols.append(BorderSymbol(self.bar_pos[bar_ptr], row, self.bar_pos[bar_ptr + 8]))
+
+            # continue search after start signature
+            bar_ptr += 6;
+
+        return symbols
+
+    def add_border_symbol(self, border_symbols: list, new_symbol: BorderSymbol, row: int):
+        """ Append the symbol to the list it continues or start a new list """
+        if (len(border_symbols) == 0):
+            new_symbol_list = list([new_symbol])
+            border_symbols.append(new_symbol_list)
+        else:
+            # try to match it to one of the existing lists
+            for symbols in border_symbols:
+                # compare to last symbol
+                last_symbol = symbols[len(symbols) - 1]
+
+                # not part of current list
+                if (row - last_symbol.y1 >= self.CLOSED_BORDER_GAP or abs(new_symbol.x1 - last_symbol.x1) >= 5 or abs(new_symbol.x2 - last_symbol.x2) >= 5):
+                    continue
+
+                # add to current list
+                symbols.append(new_symbol)
+                new_symbol = None
+                break
+
+            # start a new list
+            if (new_symbol is not None):
+                new_symbol_list = list([new_symbol])
+                border_symbols.append(new_symbol_list)
+
+    def match_start_and_stop(self, start_list: list, stop_list: list) -> bool:
+        # calculate start and stop patterns relative to image coordinates
+        start_border = BorderPattern(False, start_list)
+        stop_border = BorderPattern(True, stop_list)
+        
+        # borders slopes must be less than 45 deg
+        if (start_border.delta_y <= abs(start_border.delta_x) or stop_border.delta_y <= abs(stop_border.delta_x)):
+            return False
+
+        # stop must be to the right of start
+        if (stop_border.center_x <= start_border.center_x):
+            return False
+
+        # center line
+        center_delta_x = stop_border.center_x - start_border.center_x
+        center_delta_y = stop_border.center_y - start_border.center_y
+        center_length = sqrt(center_delta_x * center_delta_x + center_delta_y * center_delta_y)
+        
+        # angle bewteen start line and center line must be about 84 to 96
+        cos = (start_border.delta_x * center_delta_x + start_border.delta_y * center_delta_y) / (center_length * start_border.border_length)
+        if (abs(cos) > 0.1):
+            return False
+        
+        # angle bewteen start line and center line must be about 85 to 95
+        cos = (stop_border.delta_x * center_delta_x + stop_border.delta_y * center_delta_y) / (center_length * stop_border.border_length)
+        if (abs(cos) > 0.1):
+            return False
+
+        # add to the list
+        self.barcode_list.append(BarcodeArea(start_border, stop_border));
+        return True
+
+    def left_indicators(self) -> bool: 
+        # get mid column codeword
+        pos_x = self.barcode_area.left_center_x
+        pos_y = self.barcode_area.left_center_y
+        mid_codeword = self.get_codeword(pos_x, pos_y, self.barcode_area.left_delta_y, -self.barcode_area.left_delta_x)
+        last_codeword = mid_codeword
+        top_codeword = -1
+        bottom_codeword = -1
+        
+        # move up from center
+        error_count = 0
+        pos_y -= 1
+        for pos_y in range(pos_y, 0, -1):
+            if (self.expired()):
+                return False
+
+            pos_x = self.barcode_area.left_x_func_y(pos_y)
+            # get cluster plus codeword
+            codeword = self.get_codeword(pos_x, pos_y, self.barcode_area.left_delta_y, -self.barcode_area.left_delta_x)
+
+            # valid codeword
+            if (codeword >= 0):
+                if (codeword == last_codeword):
+                    if (self.ind_control != 7):
+                        self.set_info(codeword)
+                        
+                    #save position
+                    self.top_left_x = self.scan_x[0]
+                    self.top_left_y = self.scan_y[0]
+                    top_codeword = codeword
+                else:
+                    last_codeword = codeword
+                    
+                error_count = 0
+                continue
+            
+            # error
+            error_count += 1
+            if (error_count > 20):
+                break
+
+        # move down from center
+        pos_x = self.barcode_area.left_center_x
+        pos_y = self.barcode_area.left_center_y
+        last_codeword = mid_codeword
+        error_count = 0
+        
+        pos_y += 1
+        for pos_y in range(pos_y, self.image_height):
+            if (self.expired()):
+                return False
+
+            # get cluster plus codeword
+            pos_x = self.barcode_area.left_x_func_y(pos_y)
+            codeword = self.get_codeword(pos_x, pos_y, self.barcode_area.left_delta_y, -self.barcode_area.left_delta_x)
+                
+            # valid codeword
+            if (codeword >= 0):
+                if (codeword == last_codeword):
+                    if (self.ind_control != 7):
+                        self.set_info(codeword)
+
+                    #save position
+                    self.bottom_left_x = self.scan_x[0]
+                    self.bottom_left_y = self.scan_y[0]
+                    bottom_codeword = codeword
+                else:
+                    last_codeword = codeword
+                
+                error_count = 0
+                continue
+            
+            # error
+            error_count += 1
+            if (error_count > 20):
+                break
+
+        if (top_codeword < 0 or bottom_codeword < 0):
+            return False
+        
+        cluster = top_codeword >> 10
+        self.top_left_row = 3 * int((top_codeword & 0x3ff) / 30) + cluster
+        self.top_left_col = -1
+        
+        cluster = bottom_codeword >> 10
+        self.bottom_left_row = 3 * int((bottom_codeword & 0x3ff) / 30) + cluster
+        self.bottom_left_col = -1
+        
+        return True
+
+    def right_indicators(self) -> bool:
+        # get mid column codeword
+        pos_x = self.barcode_area.right_center_x
+        pos_y = self.barcode_area.right_center_y
+        mid_codeword = self.rev_get_codeword(pos_x, pos_y, self.barcode_area.right_delta_y, -self.barcode_area.right_delta_x)
+        last_codeword = mid_codeword
+        top_codeword = -1
+        bottom_codeword = -1
+        
+        # move up from center
+        error_count = 0
+        for pos_y in range(pos_y, 0, -1):
+            if (self.expired()):
+                return False
+
+            pos_x = self.barcode_area.right_x_func_y(pos_y)
+            # get cluster plus codeword
+            codeword = self.rev_get_codeword(pos_x, pos_y, self.barcode_area.right_delta_y, -self.barcode_area.right_delta_x)
+
+            # valid codeword
+            if (codeword >= 0):
+                if (codeword == last_codeword):
+                    if (self.ind_control != 7):
+                        self.set_info(codeword)
+                        
+                    #save position
+                    self.top_right_x = self.scan_x[0]
+                    self.top_right_y = self.scan_y[0]
+                    top_codeword = codeword
+                else:
+                    last_codeword = codeword
+                    
+                error_count = 0
+                continue
+            
+            # error
+            error_count += 1
+            if (error_count > 20):
+                break
+
+        # move down from center
+        pos_x = self.barcode_area.right_center_x
+        pos_y = self.barcode_area.right_center_y
+        last_codeword = mid_codeword
+        error_count = 0
+        
+        pos_y += 1
+        for pos_y in range(pos_y, self.image_height):
+            if (self.expired()):
+                return False
+
+            # get cluster plus codeword
+            pos_x = self.barcode_area.right_x_func_y(pos_y)
+            codeword = self.rev_get_codeword(pos_x, pos_y, self.barcode_area.right_delta_y, -self.barcode_area.right_delta_x)
+                
+            # valid codeword
+            if (codeword >= 0):
+                if (codeword == last_codeword):
+                    if (self.ind_control != 7):
+                        self.set_info(codeword)
+
+                    #save position
+                    self.bottom_right_x = self.scan_x[0]
+                    self.bottom_right_y = self.scan_y[0]
+                    bottom_codeword = codeword
+                else:
+                    last_codeword = codeword
+                
+                error_count = 0
+                continue
+            
+            # error
+            error_count += 1
+            if (error_count > 20):
+                break
+
+        if (self.ind_control != 7 or top_codeword < 0 or bottom_codeword < 0):
+            return False
+        
+        cluster = top_codeword >> 10
+        self.top_right_row = 3 * int((top_codeword & 0x3ff) / 30) + cluster
+        self.top_right_col = self.data_columns
+        
+        cluster = bottom_codeword >> 10
+        self.bottom_right_row = 3 * int((bottom_codeword & 0x3ff) / 30) + cluster
+        self.bottom_right_col = self.data_columns
+        
+        return True
+
+    def set_info(self, codeword: int):
+        cluster = codeword >> 10
+        info = (codeword & 0x3ff) % 30
+        
+        if (cluster == 0):
+            if ((self.ind_control & 1) == 0):
+                self.data_rows += info * 3 + 1
+                self.ind_control |= 1
+            
+        elif (cluster == 1):
+            if ((self.ind_control & 2) == 0):
+                data_rows_extra = info % 3
+                self.error_correction_length = 1 << int((info / 3 + 1))
+                self.data_rows += data_rows_extra
+                self.ind_control |= 2
+        elif (cluster == 2):
+            if ((self.ind_control & 4) == 0):
+                self.data_columns = info + 1
+                self.ind_control |= 4
+                 
+    def set_trans_matrix(self) -> bool:
+        matrix = np.zeros((8, 9), dtype = float)
+    
+        matrix[0, 0] = self.top_left_col
+        matrix[0, 1] = self.top_left_row
+        matrix[0, 2] = 1.0
+        matrix[0, 6] = -self.top_left_col * self.top_left_x
+        matrix[0, 7] = -self.top_left_row * self.top_left_x
+        matrix[0, 8] = self.top_left_x
+
+        matrix[1, 0] = self.top_right_col
+        matrix[1, 1] = self.top_right_row
+        matrix[1, 2] = 1.0
+        matrix[1, 6] = -self.top_right_col * self.top_right_x
+        matrix[1, 7] = -self.top_right_row * self.top_right_x
+        matrix[1, 8] = self.top_right_x
+
+        matrix[2, 0] = self.bottom_left_col
+        matrix[2, 1] = self.bottom_left_row
+        matrix[2, 2] = 1.0
+        matrix[2, 6] = -self.bottom_left_col * self.bottom_left_x
+        matrix[2, 7] = -self.bottom_left_row * self.bottom_left_x
+        matrix[2, 8] = self.bottom_left_x
+
+        matrix[3, 0] = self.bottom_right_col
+        matrix[3, 1] = self.bottom_right_row
+        matrix[3, 2] = 1.0
+        matrix[3, 6] = -self.bottom_right_col * self.bottom_right_x
+        matrix[3, 7] = -self.bottom_right_row * self.bottom_right_x
+        matrix[3, 8] = self.bottom_right_x
+
+        matrix[4, 3] = self.top_left_col
+        matrix[4, 4] = self.top_left_row
+        matrix[4, 5] = 1.0
+        matrix[4, 6] = -self.top_left_col * self.top_left_y
+        matrix[4, 7] = -self.top_left_row * self.top_left_y
+        matrix[4, 8] = self.top_left_y
+
+        matrix[5, 3] = self.top_right_col
+        matrix[5, 4] = self.top_right_row
+        matrix[5, 5] = 1.0
+        matrix[5, 6] = -self.top_right_col * self.top_right_y
+        matrix[5, 7] = -self.top_right_row * self.top_right_y
+        matrix[5, 8] = self.top_right_y
+
+        matrix[6, 3] = self.bottom_left_col
+        matrix[6, 4] = self.bottom_left_row
+        matrix[6, 5] = 1.0
+        matrix[6, 6] = -self.bottom_left_col * self.bottom_left_y
+        matrix[6, 7] = -self.bottom_left_row * self.bottom_left_y
+        matrix[6, 8] = self.bottom_left_y
+
+        matrix[7, 3] = self.bottom_right_col
+        matrix[7, 4] = self.bottom_right_row
+        matrix[7, 5] = 1.0
+        matrix[7, 6] = -self.bottom_right_col * self.bottom_right_y
+        matrix[7, 7] = -self.bottom_right_row * self.bottom_right_y
+        matrix[7, 8] = self.bottom_right_y
+
+        for row in range(8):
+            row
+            # If the element is zero, make it non zero by adding another row
+            if (matrix[row, row] == 0):
+                for row1 in range(row + 1, 8):
+                    if (matrix[row1, row] != 0):
+                        break
+                    
+                if (row1 == 8):
+                    return False
+                
+                for col in range(row, 9):
+                    matrix[row, col] += matrix[row1, col]
+            
+            #make the diagonal element 1.0 
+            for col in range(8, row, -1):
+                m1 = matrix[row, col]
+                m2 = matrix[row, row]
+                m3 = m1 / m2
+                matrix[row, col] = m3
+            
+            # subtract current row from next rows to eliminate one value
+            for row1 in range(row + 1, 8):
+                for col in range(8, row, -1):
+                    m1 = matrix[row, col]
+                    m2 =  matrix[row1, row]
+                    m3 = m1 * m2
+                    matrix[row1, col] -= m3
+
+        # go up from last row and eliminate all solved values
+        for col in range(7, 0, -1):
+            for row in range(col - 1, -1, -1):
+                m1 = matrix[row, col]
+                m2 = matrix[col, 8]
+                m3 = m1 * m2
+                matrix[row, 8] -= m3
+
+        # save transformation matrix coefficients
+        self.trans4a = matrix[0, 8];
+        self.trans4b = matrix[1, 8];
+        self.trans4c = matrix[2, 8];
+        self.trans4d = matrix[3, 8];
+        self.trans4e = matrix[4, 8];
+        self.trans4f = matrix[5, 8];
+        self.trans4g = matrix[6, 8];
+        self.trans4h = matrix[7, 8];
+        
+        return True
+
+    def get_codewords(self) -> bool:
+        try:
+            # codewords array
+            self.codewords = list([0] * (self.data_columns * self.data_rows))
+            cwptr = 0
+            
+            erasures_count = 0
+            
+            for barcode_y in range(self.data_rows):
+                if (self.expired()):
+                    return False
+
+                for barcode_x in range(self.data_columns):
+                    codeword = self.data_codeword(barcode_x, barcode_y)
+                    
+                    if (codeword < 0):
+                        self.codewords[cwptr] = 0
+                        cwptr += 1
+                        erasures_count += 1
+                        if (erasures_count > self.error_correction_length / 2):
+                            self.error_correction_status = ErrorCorrectionStatus.UNCORRECTABLE
+                            return False
+                    else:
+                        self.codewords[cwptr] = codeword
+                        cwptr += 1
+            
+            if (self.codeword_cache is not None and not self.verify_only):
+                self.codewords_key = codewords_key(self.codewords, self.error_correction_length)
+                self.cached_codewords = self.codeword_cache.get(self.codewords_key)
+
+                if (self.cached_codewords is not None):
+                    self.codewords = self.cached_codewords.codewords
+                    self.error_correction_count = self.cached_codewords.error_correction_count
+                    self.error_correction_status = self.cached_codewords.error_correction_status
+                    return True
+
+            return self.error_correction()
+        except:
+            return False
+
+    def error_correction(self) -> bool:
+        """ Detect (verify only mode) or correct the codeword errors """
+        if (self.verify_only):
+            if (pdf417decoder.ErrorCorrection.verify_codewords(self.codewords, self.error_correction_length)):
+                self.error_correction_status = ErrorCorrectionStatus.CLEAN
+            else:
+                self.error_correction_status = ErrorCorrectionStatus.ERRORS_DETECTED
+            return True
+
+        test_result = pdf417decoder.ErrorCorrection.test_codewords(self.codewords, self.error_correction_length)
+        error_correction_count = test_result[0]
+
+        # Too many errors decode failed
+        if (error_correction_count < 0):
+            self.error_correction_status = ErrorCorrectionStatus.UNCORRECTABLE
+            return False
+
+        self.codewords = test_result[1]
+        self.error_correction_count = error_correction_count
+
+        if (error_correction_count == 0):
+            self.error_correction_status = ErrorCorrectionStatus.CLEAN
+        else:
+            self.error_correction_status = ErrorCorrectionStatus.CORRECTED
+
+        return True
+
+    def round_away_from_zero(self, x) -> int:
+        if x >= 0.0:
+            return int(math.floor(x + 0.5))
+        else:
+            return int(math.ceil(x - 0.5))
+        
+    def data_codeword(self, data_matrix_x: int, data_matrix_y: int) -> int:
+        w = self.trans4g * data_matrix_x + self.trans4h * data_matrix_y + 1.0
+        orig_x = self.round_away_from_zero((self.trans4a * data_matrix_x + self.trans4b * data_matrix_y + self.trans4c) / w)
+        orig_y = self.round_away_from_zero((self.trans4d * data_matrix_x + self.trans4e * data_matrix_y + self.trans4f) / w)
+        
+        data_matrix_x += 1
+        w = self.trans4g * data_matrix_x + self.trans4h * data_matrix_y + 1.0
+        delta_x = self.round_away_from_zero((self.trans4a * data_matrix_x + self.trans4b * data_matrix_y + self.trans4c) / w) - orig_x
+        delta_y = self.round_away_from_zero((self.trans4d * data_matrix_x + self.trans4e * data_matrix_y + self.trans4f) / w) - orig_y
+        
+        codeword = self.get_codeword(orig_x, orig_y, delta_x, delta_y)
+        
+        if (codeword >= 0 and codeword >> 10 == data_matrix_y % 3):
+            return codeword & 0x3ff
+        
+        # try to fix the problem
+        for index in range(len(self.Y_STEP)):
+            y = orig_y + self.Y_STEP[index]
+            x = orig_x - int((y - orig_y) * delta_y / delta_x)
+            codeword = self.get_codeword(x, y, delta_x, delta_y)
+            
+            if (codeword >= 0 and codeword >> 10 == data_matrix_y % 3):
+                return codeword & 0x3ff
+
+        # error return
+        return -1;
+
+    def codewords_to_text(self, binary_data: bytearray, seg_len: int):
+        """Convert codewords to text"""
+        transitions = pdf417decoder.StaticTables.TEXT_TRANSITIONS
+        append = binary_data.append
+        mode = int(self._text_encoding_mode)
+        last_ptr = self.codewords_ptr + seg_len - 1
+
+        # each codeword is made of two codes, high code first
+        for ptr in range(self.codewords_ptr, last_ptr + 1):
+            codeword = self.codewords[ptr]
+
+            ascii_char, mode = transitions[mode][codeword // 30]
+            if (ascii_char != 0):
+                append(ascii_char)
+
+            # code 29 at the end of the segment is padding
+            code = codeword % 30
+            if (code == 29 and ptr == last_ptr):
+                break
+
+            ascii_char, mode = transitions[mode][code]
+            if (ascii_char != 0):
+                append(ascii_char)
+
+        self.codewords_ptr = last_ptr + 1
+        self._text_encoding_mode = TextEncodingMode(mode)
+
+    def get_codeword(self, left_x: int, left_y: int, delta_x: int, delta_y: int):
+        # make sure we are on a white to black transition
+        result = self.white_to_black_transition(left_x, left_y, delta_x, delta_y)
+        left_x = result[0]
+        left_y = result[1]
+        
+        if (left_x == -1 and left_y == -1):
+            return -2
+            
+        # go right looking for color transition
+        self.scan_x[0] = left_x
+        self.scan_y[0] = left_y
+        
+        dot_color = True
+        t = 1
+        x = left_x + 1
+        
+        while (True):
+            if (t >= 9):
+                break
+
+            y = left_y + int((x - left_x) * delta_y / delta_x)
+            
+            if (y >= len(self.image_matrix) or x >= len(self.image_matrix[0])):
+                return -2
+            
+            if (self.image_matrix[y, x] == dot_color):
+                x += 1
+                continue
+            
+            dot_color = not dot_color
+            self.scan_x[t] = x
+            self.scan_y[t] = y
+            
+            t += 1
+            x += 1
+
+        return self.scan_to_codeword()
+
+    def rev_get_codeword(self, right_x: int, right_y: int, delta_x: int, delta_y: int) -> int:
+        # make sure we are on a white to black transition
+        result = self.white_to_black_transition(right_x, right_y, delta_x, delta_y)
+        right_x = result[0]
+        right_y = result[1]
+        
+        if (right_x == -1 and right_y == -1):
+            return -1
+        
+        # go left looking for color transition
+        self.scan_x[8] = right_x
+        self.scan_y[8] = right_y
+        
+        dot_color = False
+        t = 7
+        x = right_x - 1
+        
+        while (True):
+            y = right_y + int((x - right_x) * delta_y / delta_x)
+            
+            if (abs(y) >= len(self.image_matrix) or abs(x) >= len(self.image_matrix[0])):
+                return -2
+            
+            if (self.image_matrix[y, x] == dot_color):
+                x -= 1
+                continue
+            
+            dot_color = not dot_color
+            self.scan_x[t] = x
+            self.scan_y[t] = y
+            
+            t -= 1
+            x -= 1
+            
+            if (t < 0):
+                break
+
+        return self.scan_to_codeword()
+
+    def white_to_black_transition(self, pos_x: int, pos_y: int, delta_x: int, delta_y: int) -> Tuple[int, int]:
+        try:
+            # current pixel is black
+            if (self.image_matrix[pos_y, pos_x]):
+                # pixel on the left is white
+                if (not self.image_matrix[pos_y, pos_x - 1]):
+                    return (pos_x, pos_y)
+
+                # go left to find first white pixel
+                x = pos_x - 1
+                while (True):
+                    # matching y coordinate
+                    y = pos_y + int((x - pos_x) * delta_y / delta_x)
+
+                    if (abs(y) >= len(self.image_matrix) or abs(x) >= len(self.image_matrix[0])):
+                        return (-1, -1)
+            
+                    # pixel is white
+                    if (not self.image_matrix[y, x]):
+                        return (pos_x, pos_y)
+
+                    # move current pixel one to the left
+                    pos_x = x
+                    pos_y = y
+                    x -= 1
+
+            # current pixel is white
+            # go right to the next transition from white to black
+            x = pos_x + 1
+            while (True):
+                # matching y coordinate
+                y = pos_y + int((x - pos_x) * delta_y / delta_x)
+                
+                
+                if (abs(y) >= len(self.image_matrix) or abs(x) >= len(self.image_matrix[0])):
+                    return (-1, -1)
+
+                # pixel is white
+                if (self.image_matrix.shape[0] <= y or self.image_matrix.shape[1] <= x):
+                    return (-1, -1)
+                
+                if (not self.image_matrix[y, x]):
+                    x += 1
+                    continue
+
+                # return black point
+                pos_x = x
+                pos_y = y
+                return (pos_x, pos_y)
+        except:
+            return (-1, -1)
+
+    def scan_to_codeword(self) -> int:
+        # line slope
+        scan_delta_x = self.scan_x[8] - self.scan_x[0]
+        scan_delta_y = self.scan_y[8] - self.scan_y[0]
+
+        # line length
+        length = sqrt(scan_delta_x * scan_delta_x + scan_delta_y * scan_delta_y)
+        
+        if (abs(length - self.average_symbol_width) > self.max_symbol_error):
+            return -1
+        
+        # one over one bar width
+        inv_width = self.MODULES_IN_CODEWORD / length
+
+        symbol = 0
+        mode = 9
+        
+        # loop for two bars
+        for bar_index in range(6):
+            bdx = self.scan_x[bar_index + 2] - self.scan_x[bar_index]
+            bdy = self.scan_y[bar_index + 2] - self.scan_y[bar_index]
+            
+            # two bars width must be 2 to 9
+            two_bars = self.round_away_from_zero(inv_width * sqrt(bdx * bdx + bdy * bdy))
+            
+            if (two_bars < 2 or two_bars > 9):
+                return -1
+            
+            # accumulate symbol
+            # symbol is made of 6 two bars width
+            # we subtract 2 to make the range of 0 to 7 (3 bits)
+            # we pack 6 two bar width into 18 bits
+            symbol |= (two_bars - 2) << 3 * (5 - bar_index)
+
+            if (bar_index == 0 or bar_index == 4):
+                mode += two_bars
+            elif (bar_index == 1 or bar_index == 5):
+                mode -= two_bars
+            
+        # test mode
+        mode = mode % 9
+        
+        if (mode != 0 and mode != 3 and mode != 6):
+            return -1
+            
+        # translate symbol to cluster plus codeword
+        symbol_table = pdf417decoder.StaticTables.SYMBOL_TABLE
+        symbol_found = self.find_symbol(symbol_table, symbol << 12);
+
+        # symbol not found
+        if (symbol_found < 0):
+            return -1;
+
+        # symbol found
+        return symbol_found & 0xfff
+
+    def find_symbol(self, array, element):
+        for symbol in array:
+            if ((symbol & 0x7ffff000) == element):
+                return symbol
+            
+        return -1
+
+    def cache_segments(self, barcode_index: int) -> Iterator[Segment]:
+        """Convert codewords to data like codewords_to_segments and keep the result in the codeword cache
+
+        Raises:
+            ValueError: Codewords are not valid barcode data
+        """
+        segments = list()
+
+        for segment in self.codewords_to_segments(barcode_index):
+            segments.append((segment.segment_type, len(segment.data), segment.gli_command, segment.gli_value))
+            yield segment
+
+        global_label_ids = (self.global_label_id_character_set, self.global_label_id_character_set_number,
+            self.global_label_id_general_purpose, self.global_label_id_user_defined)
+
+        self.codeword_cache.put(self.codewords_key, CachedCodewords(self.codewords, self.error_correction_count,
+            self.error_correction_status, bytes(self.barcode_binary_data), segments, global_label_ids, self.macro_block))
+
+    def cached_segments(self, barcode_index: int) -> Iterator[Segment]:
+        """ Restore the data of cached codewords, yielding the same segments as codewords_to_segments """
+        cached = self.cached_codewords
+        self.barcode_binary_data = bytearray(cached.barcode_data)
+        self.macro_block = cached.macro_block
+        (self.global_label_id_character_set, self.global_label_id_character_set_number,
+            self.global_label_id_general_purpose, self.global_label_id_user_defined) = cached.global_label_ids
+
+        # as in codewords_to_segments the views are not over barcode_binary_data
+        binary_data_view = memoryview(cached.barcode_data)
+        start = 0
+        for segment_type, length, gli_command, gli_value in cached.segments:
+            yield Segment(segment_type, binary_data_view[start:start + length], barcode_index, gli_command, gli_value)
+            start += length
+
+    def codewords_to_data(self) -> bool:
+        """Convert codewords to data"""
+        try:
+            for segment in self.codewords_to_segments():
+                pass
+        except ValueError:
+            return False
+
+        # return binary bytes array
+        return True
+
+    def codewords_to_segments(self, barcode_index: int = 0) -> Iterator[Segment]:
+        """Convert codewords to data, yielding each segment as soon as it is converted
+
+        Raises:
+            ValueError: Codewords are not valid barcode data
+        """
+        # data codewords pointer and end
+        self.codewords_ptr = 1;
+        codewords_end = self.codewords[0]
+
+        # make sure data length make sense
+        if (codewords_end + self.error_correction_length != self.data_columns * self.data_rows):
+            raise ValueError("Data length does not match barcode size")
+
+        # initialize encoding modes
+        self._encoding_mode = EncodingMode.TEXT;
+        self._text_encoding_mode = TextEncodingMode.UPPER;
+        self.macro_block = None
+
+        # binary data result, one codeword is at most 3 bytes of data
+        # the buffer is never resized so segments can be views over it
+        binary_data = bytearray(3 * codewords_end)
+        binary_data_view = memoryview(binary_data)
+        binary_data_length = 0
+
+        # data of the current segment
+        segment_data = bytearray()
+
+        while (self.codewords_ptr < codewords_end):
+            # load codeword at current pointer
+            command = self.codewords[self.codewords_ptr]
+            self.codewords_ptr += 1
+
+            # for the first time this codeword can be data
+            if (command < 900):
+                command = self.SWITCH_TO_TEXT_MODE
+                self.codewords_ptr -= 1
+
+            # macro control block takes the rest of the data codewords
+            if (command == self.MACRO_CONTROL_BLOCK):
+                self.macro_block = self.macro_control_block(codewords_end)
+                break
+            
+            # count codewords data 
+            seg_end = self.codewords_ptr
+            while (seg_end < codewords_end and self.codewords[seg_end] < 900):
+                seg_end += 1
+
+            seg_len = seg_end - self.codewords_ptr
+            
+            if (seg_len == 0):
+                continue
+
+            segment_data.clear()
+            gli_value = None
+            
+            if (command == self.SWITCH_TO_BYTE_MODE):
+                segment_type = SegmentType.BYTE
+                self._text_encoding_mode = TextEncodingMode.UPPER
+                self.codewords_to_bytes(segment_data, seg_len, False)
+            elif (command == self.SWITCH_TO_BYTE_MODE_FOR_SIX):
+                segment_type = SegmentType.BYTE
+                self._text_encoding_mode = TextEncodingMode.UPPER
+                self.codewords_to_bytes(segment_data, seg_len, True)
+            elif (command == self.SHIFT_TO_BYTE_MODE):
+                segment_type = SegmentType.BYTE
+                shift_byte = self.codewords[self.codewords_ptr]
+                self.codewords_ptr += 1
+                if (shift_byte >= 900):
+                    raise ValueError("Invalid shift to byte codeword")
+                segment_data.append(shift_byte)
+            elif (command == self.SWITCH_TO_TEXT_MODE):
+                segment_type = SegmentType.TEXT
+                self.codewords_to_text(segment_data, seg_len)
+            elif (command == self.SWITCH_TO_NUMERIC_MODE):
+                segment_type = SegmentType.NUMERIC
+                self._text_encoding_mode = TextEncodingMode.UPPER
+                self.codewords_to_numeric(segment_data, seg_len)
+            elif (command == self.GLI_CHARACTER_SET):
+                segment_type = SegmentType.GLI
+                if (binary_data_length > 0):
+                    raise ValueError("Global label identifier after data")
+                
+                g1 = self.codewords[self.codewords_ptr]
+                self.codewords_ptr += 1
+                
+                if (g1 >= 900):
+                    raise ValueError("Invalid global label identifier")
+                
+                self.global_label_id_character_set_number = g1
+                part = g1 - 2
+                
+                if (part < 1 or part > 9 and part != 13 and part != 15):
+                    part = 1
+
+                self.global_label_id_character_set = "ISO-8859-" + str(part)
+                gli_value = g1
+            elif (command == self.GLI_GENERAL_PURPOSE):
+                segment_type = SegmentType.GLI
+                if (binary_data_length > 0):
+                    raise ValueError("Global label identifier after data")
+                
+                g2 = self.codewords[self.codewords_ptr]
+                self.codewords_ptr += 1
+                g3 = self.codewords[self.codewords_ptr]
+                self.codewords_ptr += 1
+                
+                if (g2 >= 900 or g3 >= 900):
+                    raise ValueError("Invalid global label identifier")
+                
+                self.global_label_id_general_purpose = 900 * (g2 + 1) + g3
+                gli_value = self.global_label_id_general_purpose
+            elif (command == self.GLI_USER_DEFINED):
+                segment_type = SegmentType.GLI
+                if (binary_data_length > 0):
+                    raise ValueError("Global label identifier after data")
+                
+                g4 = self.codewords[self.codewords_ptr]
+                self.codewords_ptr += 1
+                
+                if (g4 >= 900):
+                    raise ValueError("Invalid global label identifier")
+                
+                self.global_label_id_user_defined = 810900 + g4
+                gli_value = self.global_label_id_user_defined
+            else:
+                raise ValueError("Unsupported control codeword " + str(command))
+
+            # copy segment to the binary data buffer and pass on a view of it
+            segment_end = binary_data_length + len(segment_data)
+            binary_data[binary_data_length:segment_end] = segment_data
+            segment_view = binary_data_view[binary_data_length:segment_end]
+            binary_data_length = segment_end
+
+            if (segment_type == SegmentType.GLI):
+                yield Segment(segment_type, segment_view, barcode_index, command, gli_value)
+            else:
+                yield Segment(segment_type, segment_view, barcode_index)
+
+        self.barcode_binary_data = binary_data[:binary_data_length]
+
+    def macro_control_block(self, codewords_end: int) -> MacroBlock:
+        """Convert Macro PDF417 control block codewords
+
+        Raises:
+            ValueError: Control block codewords are not valid
+        """
+        # segment index is a 5 digits numeric compaction of two codewords
+        if (self.codewords_ptr + 2 > codewords_end):
+            raise ValueError("Macro PDF417 control block without segment index")
+
+        digits = bytearray()
+        self.codewords_to_numeric(digits, 2)
+        segment_index = int(digits)
+
+        # file ID codewords up to the first optional field or terminator
+        file_id = list()
+        while (self.codewords_ptr < codewords_end and self.codewords[self.codewords_ptr] < 900):
+            file_id.append("%03d" % self.codewords[self.codewords_ptr])
+            self.codewords_ptr += 1
+
+        macro_block = MacroBlock(segment_index, "".join(file_id))
+
+        while (self.codewords_ptr < codewords_end):
+            command = self.codewords[self.codewords_ptr]
+            self.codewords_ptr += 1
+
+            if (command == self.MACRO_TERMINATOR):
+                macro_block.is_last_segment = True
+                continue
+
+            if (command != self.MACRO_OPTIONAL_FIELD or self.codewords_ptr >= codewords_end):
+                raise ValueError("Invalid Macro PDF417 control block codeword " + str(command))
+
+            field = self.codewords[self.codewords_ptr]
+            self.codewords_ptr += 1
+
+            # count field codewords
+            field_end = self.codewords_ptr
+            while (field_end < codewords_end and self.codewords[field_end] < 900):
+                field_end += 1
+
+            field_len = field_end - self.codewords_ptr
+            field_data = bytearray()
+
+            # file name, sender and addressee are text, other fields are numeric
+            if (field == 0 or field == 3 or field == 4):
+                self._text_encoding_mode = TextEncodingMode.UPPER
+                self.codewords_to_text(field_data, field_len)
+                text = field_data.decode("ISO-8859-1")
+
+                if (field == 0):
+                    macro_block.file_name = text
+                elif (field == 3):
+                    macro_block.sender = text
+                else:
+                    macro_block.addressee = text
+            elif (field == 1 or field == 2 or field == 5 or field == 6):
+                self.codewords_to_numeric(field_data, field_len)
+                number = int(field_data) if len(field_data) > 0 else 0
+
+                if (field == 1):
+                    macro_block.segment_count = number
+                elif (field == 2):
+                    macro_block.time_stamp = number
+                elif (field == 5):
+                    macro_block.file_size = number
+                else:
+                    macro_block.checksum = number
+            else:
+                raise ValueError("Invalid Macro PDF417 optional field " + str(field))
+
+        return macro_block
+
+    def codewords_to_bytes(self, binary_data: bytearray, seg_len: int, six_flag: bool):
+        """Convert codewords to bytes"""
+        # Number of whole 5 codewords blocks
+        blocks = int(seg_len / 5)
+
+        # if number of blocks is one or more and SixFlag is false, the last block is not converted 5 to 6
+        if ((seg_len % 5) == 0 and blocks >= 1 and not six_flag):
+            blocks -= 1
+
+        # convert all blocks at once
+        if (blocks > 0):
+            blocks_end = self.codewords_ptr + 5 * blocks
+            block_codewords = np.array(self.codewords[self.codewords_ptr:blocks_end], dtype=np.uint64).reshape(blocks, 5)
+            block_values = block_codewords @ self.BYTE_BLOCK_POWERS
+            block_bytes = (block_values[:, np.newaxis] >> self.BYTE_BLOCK_SHIFTS) & np.uint64(0xff)
+            binary_data.extend(block_bytes.astype(np.uint8).tobytes())
+            self.codewords_ptr = blocks_end
+
+        # left over
+        seg_len -= 5 * blocks
+        
+        if (seg_len > 0):
+            binary_data.extend([codeword % 256 for codeword in self.codewords[self.codewords_ptr:self.codewords_ptr + seg_len]])
+            self.codewords_ptr += seg_len
+
+    def codewords_to_numeric(self, binary_data: bytearray, seg_len: int):
+        """Convert codewords to numeric characters"""
+        segment = self.codewords[self.codewords_ptr:self.codewords_ptr + seg_len]
+        self.codewords_ptr += seg_len
+
+        # convert all blocks of 15 or less codewords to digit strings
+        numbers = list()
+
+        for block_start in range(0, seg_len, 15):
+            block = segment[block_start:block_start + 15]
+            temp = sum(map(operator.mul, block, self.NUMERIC_BLOCK_POWERS[len(block)]))
+
+            # convert number to a string
+            numbers.append(str(temp)[1:]) # skip first digit, it is 1
+
+        binary_data.extend("".join(numbers).encode("ascii"))
+
+    def convert_image(self) -> bool:
+        """ Convert image to black and white boolean matrix, unless the image was binarized ahead """
+        if (self.image_matrix is None):
+            self.image_matrix = binarize_image(self.input_image, self.buffers)
+
+        self.image_height, self.image_width = self.image_matrix.shape
+        
+        return True
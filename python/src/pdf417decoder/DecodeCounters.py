@@ -0,0 +1,37 @@
+class DecodeCounters:
+    """
+        Hot path event counts of a decode, to tell why an image was expensive.
+        The counters of an image include the barcodes that failed to decode.
+    """
+
+    FIELDS = ("rows_scanned", "signature_windows", "border_lists_created", "border_lists_discarded", "candidate_pairs",
+        "get_codeword_calls", "y_step_retries", "erasures", "errors_corrected", "symbol_misses")
+
+    def __init__(self):
+        # image rows converted to bars and bar windows tested for a start or stop signature
+        self.rows_scanned = 0
+        self.signature_windows = 0
+        # start and stop border symbols lists, discarded when shorter than 18 rows
+        self.border_lists_created = 0
+        self.border_lists_discarded = 0
+        # start and stop border pairs tested for a barcode area
+        self.candidate_pairs = 0
+        # codewords scanned (both directions), data codewords scanned again at other rows and data codewords lost
+        self.get_codeword_calls = 0
+        self.y_step_retries = 0
+        self.erasures = 0
+        # codeword errors fixed by error correction
+        self.errors_corrected = 0
+        # scanned bar patterns not found in the symbol table
+        self.symbol_misses = 0
+
+    def merge(self, other: 'DecodeCounters'):
+        """ Add the counters of another barcode or image """
+        for field in self.FIELDS:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+
+    def as_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def __str__(self) -> str:
+        return "\n".join("{0:<24} {1:>10}".format(field, getattr(self, field)) for field in self.FIELDS)
@@ -0,0 +1,82 @@
+class DecodeResult:
+    """Results of decoding one image"""
+
+    @property
+    def barcodes_info(self) -> list:
+        """ Decoded barcodes binary data plus extra information (list of BarcodeInfo) """
+        return self._barcodes_info
+
+    @barcodes_info.setter
+    def barcodes_info(self, value: list):
+        self._barcodes_info = value
+
+    @property
+    def error(self) -> str:
+        """ Error raised while loading or decoding the image, None if the decode completed """
+        return self._error
+
+    @error.setter
+    def error(self, value: str):
+        self._error = value
+
+    @property
+    def timed_out(self) -> bool:
+        """ The time budget ran out, barcodes_info holds the barcodes decoded until then """
+        return self._timed_out
+
+    @timed_out.setter
+    def timed_out(self, value: bool):
+        self._timed_out = value
+
+    @property
+    def source_index(self) -> int:
+        """ Index of the image source in the decoded sequence, None for a single image """
+        return self._source_index
+
+    @source_index.setter
+    def source_index(self, value: int):
+        self._source_index = value
+
+    @property
+    def page_index(self) -> int:
+        """ Page (frame) of a multi-page image source, None for a single image """
+        return self._page_index
+
+    @page_index.setter
+    def page_index(self, value: int):
+        self._page_index = value
+
+    @property
+    def timings(self) -> 'StageTimings':
+        """ Wall time and call count of each decode stage, None unless the decoder records timings """
+        return self._timings
+
+    @timings.setter
+    def timings(self, value: 'StageTimings'):
+        self._timings = value
+
+    @property
+    def counters(self) -> 'DecodeCounters':
+        """ Event counts of the whole image including failed barcodes, None unless the decoder counts them """
+        return self._counters
+
+    @counters.setter
+    def counters(self, value: 'DecodeCounters'):
+        self._counters = value
+
+    @property
+    def barcodes_data(self) -> list:
+        """ Decoded barcodes binary data """
+        return [barcode_info.barcode_data for barcode_info in self.barcodes_info]
+
+    def __init__(self):
+        self.barcodes_info = list()
+        self.error = None
+        self.timed_out = False
+        self.source_index = None
+        self.page_index = None
+        self.timings = None
+        self.counters = None
+
+    def __len__(self) -> int:
+        return len(self.barcodes_info)
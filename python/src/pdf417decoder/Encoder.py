@@ -0,0 +1,240 @@
+import numpy as np
+
+import pdf417decoder.StaticTables
+import pdf417decoder.ErrorCorrection
+
+# Start and stop patterns bar and space widths in modules
+START_PATTERN = (8, 1, 1, 1, 1, 1, 1, 3)
+STOP_PATTERN = (7, 1, 1, 3, 1, 1, 1, 2, 1)
+
+# Codeword limits of a barcode
+MAX_CODEWORDS = 928
+MIN_ROWS = 3
+MAX_ROWS = 90
+MAX_COLUMNS = 30
+
+# Mode switch codewords
+SWITCH_TO_BYTE_MODE = 901
+SWITCH_TO_NUMERIC_MODE = 902
+SWITCH_TO_BYTE_MODE_FOR_SIX = 924
+PADDING = 900
+
+# Text compaction control codes
+TEXT_PUNCT_SHIFT = 29
+TEXT_PAD = 29
+
+# Control codes latching from one text sub-mode to another
+TEXT_LATCHES = {
+    (pdf417decoder.StaticTables.TEXT_UPPER, pdf417decoder.StaticTables.TEXT_LOWER): [27],
+    (pdf417decoder.StaticTables.TEXT_UPPER, pdf417decoder.StaticTables.TEXT_MIXED): [28],
+    (pdf417decoder.StaticTables.TEXT_UPPER, pdf417decoder.StaticTables.TEXT_PUNCT): [28, 25],
+    (pdf417decoder.StaticTables.TEXT_LOWER, pdf417decoder.StaticTables.TEXT_UPPER): [28, 28],
+    (pdf417decoder.StaticTables.TEXT_LOWER, pdf417decoder.StaticTables.TEXT_MIXED): [28],
+    (pdf417decoder.StaticTables.TEXT_LOWER, pdf417decoder.StaticTables.TEXT_PUNCT): [28, 25],
+    (pdf417decoder.StaticTables.TEXT_MIXED, pdf417decoder.StaticTables.TEXT_UPPER): [28],
+    (pdf417decoder.StaticTables.TEXT_MIXED, pdf417decoder.StaticTables.TEXT_LOWER): [27],
+    (pdf417decoder.StaticTables.TEXT_MIXED, pdf417decoder.StaticTables.TEXT_PUNCT): [25],
+    (pdf417decoder.StaticTables.TEXT_PUNCT, pdf417decoder.StaticTables.TEXT_UPPER): [29],
+    (pdf417decoder.StaticTables.TEXT_PUNCT, pdf417decoder.StaticTables.TEXT_LOWER): [29, 27],
+    (pdf417decoder.StaticTables.TEXT_PUNCT, pdf417decoder.StaticTables.TEXT_MIXED): [29, 28],
+}
+
+def text_codes() -> list:
+    """ Code of each character in each text sub-mode (upper, lower, mixed and punctuation) """
+    tables = (pdf417decoder.StaticTables.UPPER_TO_TEXT, pdf417decoder.StaticTables.LOWER_TO_TEXT,
+        pdf417decoder.StaticTables.MIXED_TO_TEXT, pdf417decoder.StaticTables.PUNCT_TO_TEXT)
+
+    return [{table[code]: code for code in range(30) if (table[code] != 0)} for table in tables]
+
+def bar_widths(pattern: int) -> tuple:
+    """ Bar and space widths of a 17 modules symbol pattern of BAR_TABLE, first bar first """
+    widths = list()
+    previous = None
+
+    for bit in range(16, -1, -1):
+        module = (pattern >> bit) & 1
+        if (module == previous):
+            widths[-1] += 1
+        else:
+            widths.append(1)
+            previous = module
+
+    return tuple(widths)
+
+# character to code tables of the text sub-modes
+TEXT_CODES = text_codes()
+
+# bar widths table [cluster][codeword]
+BAR_PATTERNS = [[bar_widths(pattern) for pattern in patterns] for patterns in pdf417decoder.StaticTables.BAR_TABLE]
+
+def text_to_codewords(data: bytes) -> list:
+    """ Text compaction codewords, None if a byte has no text compaction code """
+    codes = list()
+    sub_mode = pdf417decoder.StaticTables.TEXT_UPPER
+    punct = pdf417decoder.StaticTables.TEXT_PUNCT
+
+    for char in data:
+        if (char in TEXT_CODES[sub_mode]):
+            codes.append(TEXT_CODES[sub_mode][char])
+            continue
+
+        # sub-modes holding the character, upper first
+        holders = [mode for mode in range(4) if (char in TEXT_CODES[mode])]
+        if (len(holders) == 0):
+            return None
+
+        # punctuation only characters are shifted, the sub-mode does not change
+        if (holders == [punct] and sub_mode != punct):
+            codes.extend([TEXT_PUNCT_SHIFT, TEXT_CODES[punct][char]])
+            continue
+
+        codes.extend(TEXT_LATCHES[(sub_mode, holders[0])])
+        sub_mode = holders[0]
+        codes.append(TEXT_CODES[sub_mode][char])
+
+    # two codes per codeword, the padding code is ignored at the end of the segment
+    if (len(codes) % 2 == 1):
+        codes.append(TEXT_PAD)
+
+    return [30 * codes[index] + codes[index + 1] for index in range(0, len(codes), 2)]
+
+def numeric_to_codewords(data: bytes) -> list:
+    """ Numeric compaction codewords, blocks of 44 digits are base 900 numbers with a leading 1 """
+    codewords = list([SWITCH_TO_NUMERIC_MODE])
+
+    for block_start in range(0, len(data), 44):
+        value = int(b"1" + data[block_start:block_start + 44])
+        block = list()
+
+        while (value > 0):
+            block.append(value % 900)
+            value //= 900
+
+        codewords.extend(reversed(block))
+
+    return codewords
+
+def bytes_to_codewords(data: bytes) -> list:
+    """ Byte compaction codewords, blocks of 6 bytes are 5 base 900 codewords """
+    six_flag = len(data) % 6 == 0
+    codewords = list([SWITCH_TO_BYTE_MODE_FOR_SIX if six_flag else SWITCH_TO_BYTE_MODE])
+    blocks_end = len(data) - len(data) % 6
+
+    for block_start in range(0, blocks_end, 6):
+        value = int.from_bytes(data[block_start:block_start + 6], "big")
+        block = list()
+
+        for index in range(5):
+            block.append(value % 900)
+            value //= 900
+
+        codewords.extend(reversed(block))
+
+    # left over bytes are one codeword each
+    codewords.extend(data[blocks_end:])
+    return codewords
+
+def data_to_codewords(data: bytes) -> list:
+    """ Data codewords in a single compaction mode: numeric for digits, text if possible, else bytes """
+    if (len(data) > 0 and data.isdigit()):
+        return numeric_to_codewords(data)
+
+    # text compaction is the initial mode
+    codewords = text_to_codewords(data)
+    if (codewords is not None):
+        return codewords
+
+    return bytes_to_codewords(data)
+
+def encode(data, columns: int = 6, security_level: int = 2) -> list:
+    """Encode data into barcode rows of codewords
+
+    Args:
+        data (bytes or str): Data to encode, text is encoded as ISO-8859-1
+        columns (int, optional): Data columns, 1 to 30. Defaults to 6.
+        security_level (int, optional): Error correction level, 0 to 8 (2 ** (level + 1) codewords). Defaults to 2.
+
+    Raises:
+        ValueError: The data does not fit in a barcode of this many columns
+
+    Returns:
+        list: Rows of codewords, each made of the left row indicator, the data columns and the right row indicator
+    """
+    if (isinstance(data, str)):
+        data = data.encode("iso-8859-1")
+
+    if (columns < 1 or columns > MAX_COLUMNS):
+        raise ValueError("Columns must be 1 to {0}".format(MAX_COLUMNS))
+
+    if (security_level < 0 or security_level > 8):
+        raise ValueError("Security level must be 0 to 8")
+
+    error_correction_length = 1 << (security_level + 1)
+    data_codewords = data_to_codewords(data)
+
+    # length descriptor, data and error correction codewords
+    rows = (1 + len(data_codewords) + error_correction_length + columns - 1) // columns
+
+    if (rows < MIN_ROWS or rows > MAX_ROWS or rows * columns > MAX_CODEWORDS):
+        raise ValueError("Data needs {0} rows of {1} columns, a barcode has {2} to {3} rows and {4} codewords at most".format(
+            rows, columns, MIN_ROWS, MAX_ROWS, MAX_CODEWORDS))
+
+    length = rows * columns - error_correction_length
+    codewords = [length] + data_codewords + [PADDING] * (length - 1 - len(data_codewords))
+    codewords.extend(pdf417decoder.ErrorCorrection.error_correction_codewords(codewords, error_correction_length))
+
+    barcode_rows = list()
+
+    for row in range(rows):
+        cluster = row % 3
+        row_base = 30 * (row // 3)
+
+        # row indicators hold the rows, columns and security level, in a different order in each cluster
+        rows_info = (rows - 1) // 3
+        level_info = 3 * security_level + (rows - 1) % 3
+        columns_info = columns - 1
+        left_info, right_info = ((rows_info, columns_info), (level_info, rows_info), (columns_info, level_info))[cluster]
+
+        barcode_rows.append([row_base + left_info] + codewords[row * columns:(row + 1) * columns] + [row_base + right_info])
+
+    return barcode_rows
+
+def render(barcode_rows: list, module_size: int = 3, ratio: int = 3, quiet_zone: int = 2) -> np.ndarray:
+    """Render barcode rows to a grayscale image
+
+    Args:
+        barcode_rows (list): Rows of codewords returned by encode
+        module_size (int, optional): Width of the narrowest bar in pixels. Defaults to 3.
+        ratio (int, optional): Row height over module width. Defaults to 3.
+        quiet_zone (int, optional): White margin in modules. Defaults to 2.
+
+    Returns:
+        ndarray: 8 bit grayscale image, black bars are 0 and spaces 255
+    """
+    # start pattern, indicators and data, stop pattern
+    row_modules = 17 * (len(barcode_rows[0]) + 1) + 18
+    modules = np.zeros((len(barcode_rows), row_modules), dtype=bool)
+
+    for row in range(len(barcode_rows)):
+        cluster = row % 3
+        widths = list(START_PATTERN)
+        for codeword in barcode_rows[row]:
+            widths.extend(BAR_PATTERNS[cluster][codeword])
+        widths.extend(STOP_PATTERN)
+
+        # bars are the even elements of the pattern
+        position = 0
+        for index in range(len(widths)):
+            if (index % 2 == 0):
+                modules[row, position:position + widths[index]] = True
+            position += widths[index]
+
+    pixels = np.where(modules, np.uint8(0), np.uint8(255))
+    pixels = np.repeat(np.repeat(pixels, ratio * module_size, axis=0), module_size, axis=1)
+
+    margin = quiet_zone * module_size
+    return np.pad(pixels, margin, mode="constant", constant_values=255)
+
+def encode_image(data, columns: int = 6, security_level: int = 2, module_size: int = 3, ratio: int = 3, quiet_zone: int = 2) -> np.ndarray:
+    """ Encode data and render the barcode to a grayscale image, see encode and render """
+    return render(encode(data, columns, security_level), module_size, ratio, quiet_zone)
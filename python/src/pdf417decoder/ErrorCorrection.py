@@ -1,7 +1,25 @@
+import numpy as np
+from enum import Enum, auto
 from typing import Tuple
 from pdf417decoder import Modulus
 from pdf417decoder.Polynomial import ONE, Polynomial, ZERO
 
+# Syndrome evaluation matrices keyed by (codewords length, error correction length)
+_syndrome_matrices = dict()
+
+# Generator polynomials keyed by error correction length
+_generator_polynomials = dict()
+
+class ErrorCorrectionStatus(Enum):
+    # all syndromes are zero
+    CLEAN = auto()
+    # errors were found and corrected
+    CORRECTED = auto()
+    # errors were found but correction was not attempted (verify only)
+    ERRORS_DETECTED = auto()
+    # too many erasures or errors to correct
+    UNCORRECTABLE = auto()
+
 def test_codewords(codewords: list, error_correction_length: int) -> tuple:
     """ Decode the received codewords """
     poly_codewords = Polynomial(0, 0, codewords)
@@ -27,6 +45,90 @@ def test_codewords(codewords: list, error_correction_length: int) -> tuple:
     if (not error):
         return (0, codewords)
 
+    return correct_errors(codewords, syndrome, error_correction_length)
+
+def verify_codewords(codewords: list, error_correction_length: int) -> bool:
+    """ Test the received codewords for errors without correcting them (True if error free) """
+    syndromes = np.array(codewords, dtype=np.int64) @ syndrome_matrix(len(codewords), error_correction_length)
+    return not np.mod(syndromes, Modulus.MOD).any()
+
+def test_codewords_batch(codewords_list: list, error_correction_length: int) -> list:
+    """
+        Decode many received codewords arrays sharing the same error correction length.
+        Arrays of equal length are stacked and their syndromes are computed together,
+        error free arrays are returned as is and only the others are corrected.
+        Returns a list of (error count, codewords) tuples in the same order as test_codewords.
+    """
+    results = list([None] * len(codewords_list))
+
+    # group codewords arrays of equal length
+    groups = dict()
+    for index in range(len(codewords_list)):
+        groups.setdefault(len(codewords_list[index]), list()).append(index)
+
+    for length, indexes in groups.items():
+        matrix = np.array([codewords_list[index] for index in indexes], dtype=np.int64)
+        syndromes = np.mod(matrix @ syndrome_matrix(length, error_correction_length), Modulus.MOD)
+        dirty = syndromes.any(axis=1)
+
+        for row in range(len(indexes)):
+            codewords = codewords_list[indexes[row]]
+
+            if (not dirty[row]):
+                results[indexes[row]] = (0, codewords)
+            else:
+                results[indexes[row]] = correct_errors(codewords, syndromes[row].tolist(), error_correction_length)
+
+    return results
+
+def syndrome_matrix(length: int, error_correction_length: int) -> np.ndarray:
+    """
+        Matrix that evaluates a codewords polynomial at all syndrome points with one product.
+        Element [j, s] is the power of 3 ** (error_correction_length - s) multiplying codeword j
+    """
+    key = (length, error_correction_length)
+    matrix = _syndrome_matrices.get(key)
+
+    if (matrix is None):
+        exp_table = np.array(Modulus.exp_table, dtype=np.int64)
+        degrees = np.arange(length - 1, -1, -1, dtype=np.int64)
+        points = np.arange(error_correction_length, 0, -1, dtype=np.int64)
+        matrix = exp_table[np.outer(degrees, points) % (Modulus.MOD - 1)]
+        _syndrome_matrices[key] = matrix
+
+    return matrix
+
+def generator_polynomial(error_correction_length: int) -> Polynomial:
+    """ Product of (x - 3 ** i) for i from 1 to the error correction length, the roots of the syndromes """
+    generator = _generator_polynomials.get(error_correction_length)
+
+    if (generator is None):
+        generator = ONE
+        for i in range(1, error_correction_length + 1):
+            generator = generator.multiply(Polynomial(0, 0, list([1, Modulus.negate(Modulus.exp_table[i])])))
+        _generator_polynomials[error_correction_length] = generator
+
+    return generator
+
+def error_correction_codewords(data_codewords: list, error_correction_length: int) -> list:
+    """ Error correction codewords to append to the data codewords (encoder side of test_codewords) """
+    generator = generator_polynomial(error_correction_length).coefficients
+
+    # remainder of data codewords polynomial times x ** error_correction_length divided by the generator
+    remainder = list([0] * error_correction_length)
+
+    for codeword in data_codewords:
+        feedback = Modulus.add(codeword, remainder[0])
+        remainder = remainder[1:] + [0]
+
+        for i in range(error_correction_length):
+            remainder[i] = Modulus.subtract(remainder[i], Modulus.multiply(feedback, generator[i + 1]))
+
+    # codewords polynomial minus the remainder is a multiple of the generator
+    return [Modulus.negate(value) for value in remainder]
+
+def correct_errors(codewords: list, syndrome: list, error_correction_length: int) -> tuple:
+    """ Correct the codewords given a non zero syndrome array """
     # convert syndrom array to polynomial
     poly_syndrome = Polynomial(0, 0, syndrome)
     
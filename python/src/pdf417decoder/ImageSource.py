@@ -0,0 +1,62 @@
+import io
+import os
+import numpy as np
+from PIL import Image as PIL
+from PIL import ImageSequence
+from typing import Iterator
+
+def load_image(source) -> PIL.Image:
+    """Load a decoder input image
+
+    Args:
+        source: Image file path, encoded image file bytes, PIL image or NumPy array
+
+    Returns:
+        Image: PIL image or NumPy array accepted by the decoder
+    """
+    if (isinstance(source, (str, os.PathLike))):
+        return PIL.open(source)
+
+    if (isinstance(source, (bytes, bytearray, memoryview))):
+        return PIL.open(io.BytesIO(source))
+
+    return source
+
+def transport_image(source):
+    """Image source in a form that is cheap to send to another process
+
+    Paths and encoded bytes are sent as is and loaded by the worker,
+    PIL images are sent as NumPy arrays (one buffer instead of a PIL image state).
+    """
+    if (isinstance(source, PIL.Image)):
+        return np.asarray(source)
+
+    return source
+
+def iter_pages(source) -> Iterator[np.ndarray]:
+    """Load the pages of a decoder input image one at a time
+
+    Multi-frame images (TIFF, GIF) are read page by page, only the current page is in memory.
+    Pages of other modes than gray scale and RGB are converted to gray scale.
+
+    Args:
+        source: Image file path, encoded image file bytes, PIL image or NumPy array
+
+    Yields:
+        ndarray: Page pixels
+    """
+    image = load_image(source)
+
+    if (not isinstance(image, PIL.Image)):
+        yield np.asarray(image)
+        return
+
+    try:
+        for frame in ImageSequence.Iterator(image):
+            if (frame.mode not in ("L", "RGB")):
+                frame = frame.convert("L")
+            yield np.array(frame)
+    finally:
+        # close files opened here, images given by the caller are left open
+        if (image is not source):
+            image.close()
@@ -0,0 +1,104 @@
+class MacroBlock:
+    """Macro PDF417 control block of one barcode of a multi barcodes file"""
+
+    @property
+    def segment_index(self) -> int:
+        """ Segment index, position of this barcode in the file (0 based) """
+        return self._segment_index
+
+    @segment_index.setter
+    def segment_index(self, value: int):
+        self._segment_index = value
+
+    @property
+    def file_id(self) -> str:
+        """ File ID, the same for all barcodes of the file """
+        return self._file_id
+
+    @file_id.setter
+    def file_id(self, value: str):
+        self._file_id = value
+
+    @property
+    def is_last_segment(self) -> bool:
+        """ The control block has a Macro PDF417 terminator (922) """
+        return self._is_last_segment
+
+    @is_last_segment.setter
+    def is_last_segment(self, value: bool):
+        self._is_last_segment = value
+
+    @property
+    def segment_count(self) -> int:
+        """ Optional field 1: number of barcodes in the file or None """
+        return self._segment_count
+
+    @segment_count.setter
+    def segment_count(self, value: int):
+        self._segment_count = value
+
+    @property
+    def file_name(self) -> str:
+        """ Optional field 0: file name or None """
+        return self._file_name
+
+    @file_name.setter
+    def file_name(self, value: str):
+        self._file_name = value
+
+    @property
+    def time_stamp(self) -> int:
+        """ Optional field 2: time stamp (seconds since 1970-01-01) or None """
+        return self._time_stamp
+
+    @time_stamp.setter
+    def time_stamp(self, value: int):
+        self._time_stamp = value
+
+    @property
+    def sender(self) -> str:
+        """ Optional field 3: sender or None """
+        return self._sender
+
+    @sender.setter
+    def sender(self, value: str):
+        self._sender = value
+
+    @property
+    def addressee(self) -> str:
+        """ Optional field 4: addressee or None """
+        return self._addressee
+
+    @addressee.setter
+    def addressee(self, value: str):
+        self._addressee = value
+
+    @property
+    def file_size(self) -> int:
+        """ Optional field 5: file size in bytes or None """
+        return self._file_size
+
+    @file_size.setter
+    def file_size(self, value: int):
+        self._file_size = value
+
+    @property
+    def checksum(self) -> int:
+        """ Optional field 6: file CRC-16 checksum or None """
+        return self._checksum
+
+    @checksum.setter
+    def checksum(self, value: int):
+        self._checksum = value
+
+    def __init__(self, segment_index: int, file_id: str):
+        self.segment_index = segment_index
+        self.file_id = file_id
+        self.is_last_segment = False
+        self.segment_count = None
+        self.file_name = None
+        self.time_stamp = None
+        self.sender = None
+        self.addressee = None
+        self.file_size = None
+        self.checksum = None
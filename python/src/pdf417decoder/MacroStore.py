@@ -0,0 +1,207 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Iterator
+
+from pdf417decoder.BarcodeInfo import BarcodeInfo
+
+class MacroFile:
+    """Segments received so far of one Macro PDF417 file"""
+
+    def __init__(self, file_id: str, now: float):
+        self.file_id = file_id
+        # segment index to payload bytes, or to a spill file path
+        self.segments = dict()
+        self.segment_count = None
+        self.updated = now
+
+    def is_complete(self) -> bool:
+        if (self.segment_count is None):
+            return False
+        return all(index in self.segments for index in range(self.segment_count))
+
+    def memory_bytes(self) -> int:
+        """ Bytes of the segments kept in memory """
+        return sum(len(segment) for segment in self.segments.values() if (isinstance(segment, bytes)))
+
+class MacroStore:
+    """
+        Reassembly store of Macro PDF417 files spread over many barcodes.
+        Segments are kept in memory up to a budget and spilled to disk beyond it.
+        Incomplete files are evicted once they are not updated for the time to live.
+    """
+
+    # size of the chunks of an assembled payload
+    CHUNK_SIZE = 65536
+
+    def __init__(self, directory: str = None, max_memory_bytes: int = 16 * 1024 * 1024, ttl: float = 3600.0):
+        """
+        Args:
+            directory (str, optional): Spill directory. Defaults to a new temporary directory.
+            max_memory_bytes (int, optional): Segment bytes kept in memory before spilling to disk.
+            ttl (float, optional): Seconds an incomplete file is kept after its last segment arrived.
+        """
+        self._own_directory = directory is None
+        self.directory = tempfile.mkdtemp(prefix="pdf417macro") if directory is None else directory
+        self.max_memory_bytes = max_memory_bytes
+        self.ttl = ttl
+        self.memory_bytes = 0
+        self._files = dict()
+        # assembled files whose stream has not ended, their spill files are still on disk
+        self._streams = set()
+        self._spill_count = 0
+        self._lock = threading.Lock()
+
+    def add(self, barcode_info: BarcodeInfo) -> bool:
+        """Add a decoded Macro PDF417 barcode, returns True once its file is complete"""
+        macro_block = barcode_info.macro_block
+
+        if (macro_block is None):
+            raise ValueError("Barcode has no Macro PDF417 control block")
+
+        # verify only mode reports barcodes with detected errors without data
+        if (barcode_info.barcode_data is None):
+            raise ValueError("Barcode has no data (codewords with errors in verify only mode)")
+
+        # total segments count is either given or implied by the last segment
+        segment_count = macro_block.segment_count
+        if (segment_count is None and macro_block.is_last_segment):
+            segment_count = macro_block.segment_index + 1
+
+        return self.add_segment(macro_block.file_id, macro_block.segment_index, barcode_info.barcode_data, segment_count)
+
+    def add_segment(self, file_id: str, segment_index: int, data: bytes, segment_count: int = None) -> bool:
+        """Add one segment payload, returns True once the file is complete"""
+        with self._lock:
+            now = time.monotonic()
+            self._evict_expired(now)
+
+            macro_file = self._files.get(file_id)
+            if (macro_file is None):
+                macro_file = MacroFile(file_id, now)
+                self._files[file_id] = macro_file
+
+            macro_file.updated = now
+
+            if (segment_count is not None):
+                macro_file.segment_count = segment_count
+
+            # duplicate segments (the same barcode read twice) are ignored
+            if (segment_index not in macro_file.segments):
+                if (self.memory_bytes + len(data) <= self.max_memory_bytes):
+                    macro_file.segments[segment_index] = bytes(data)
+                    self.memory_bytes += len(data)
+                else:
+                    macro_file.segments[segment_index] = self._spill(data)
+
+            return macro_file.is_complete()
+
+    def is_complete(self, file_id: str) -> bool:
+        with self._lock:
+            macro_file = self._files.get(file_id)
+            return macro_file is not None and macro_file.is_complete()
+
+    def missing_segments(self, file_id: str) -> list:
+        """Segment indexes not received yet (None if the segments count is not known)"""
+        with self._lock:
+            macro_file = self._files.get(file_id)
+            if (macro_file is None or macro_file.segment_count is None):
+                return None
+            return [index for index in range(macro_file.segment_count) if index not in macro_file.segments]
+
+    def assemble(self, file_id: str) -> Iterator[bytes]:
+        """Remove a complete file from the store and yield its payload in chunks
+
+        The memory budget is released at once. Spill files are removed when the stream ends,
+        or by close if the stream is dropped before it ends.
+        """
+        with self._lock:
+            macro_file = self._files.get(file_id)
+            if (macro_file is None or not macro_file.is_complete()):
+                raise KeyError("Macro PDF417 file is not complete: " + file_id)
+            del self._files[file_id]
+
+            self.memory_bytes -= macro_file.memory_bytes()
+            self._streams.add(macro_file)
+
+        return self._stream(macro_file)
+
+    def evict_expired(self) -> list:
+        """Remove incomplete files not updated within the time to live, returns their file IDs"""
+        with self._lock:
+            return self._evict_expired(time.monotonic())
+
+    def close(self):
+        """Remove all files and the spill directory if the store created it"""
+        with self._lock:
+            for macro_file in self._files.values():
+                self._release(macro_file)
+            self._files.clear()
+
+            for macro_file in self._streams:
+                self._remove_spill_files(macro_file)
+            self._streams.clear()
+
+        if (self._own_directory):
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._files)
+
+    def __enter__(self) -> 'MacroStore':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _stream(self, macro_file: MacroFile) -> Iterator[bytes]:
+        try:
+            for index in range(macro_file.segment_count):
+                segment = macro_file.segments[index]
+
+                if (isinstance(segment, bytes)):
+                    yield segment
+                    continue
+
+                with open(segment, "rb") as spill_file:
+                    while (True):
+                        chunk = spill_file.read(self.CHUNK_SIZE)
+                        if (len(chunk) == 0):
+                            break
+                        yield chunk
+        finally:
+            # remove the spill files even if the consumer stops early
+            with self._lock:
+                if (macro_file in self._streams):
+                    self._streams.discard(macro_file)
+                    self._remove_spill_files(macro_file)
+
+    def _spill(self, data: bytes) -> str:
+        self._spill_count += 1
+        path = os.path.join(self.directory, "segment" + str(self._spill_count) + ".bin")
+
+        with open(path, "wb") as spill_file:
+            spill_file.write(data)
+
+        return path
+
+    def _evict_expired(self, now: float) -> list:
+        expired = [file_id for file_id, macro_file in self._files.items() if now - macro_file.updated > self.ttl]
+
+        for file_id in expired:
+            self._release(self._files.pop(file_id))
+
+        return expired
+
+    def _release(self, macro_file: MacroFile):
+        self.memory_bytes -= macro_file.memory_bytes()
+        self._remove_spill_files(macro_file)
+        macro_file.segments.clear()
+
+    def _remove_spill_files(self, macro_file: MacroFile):
+        for segment in macro_file.segments.values():
+            if (not isinstance(segment, bytes) and os.path.exists(segment)):
+                os.remove(segment)
@@ -0,0 +1,137 @@
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from pdf417decoder.Decoder import PDF417Decoder
+from pdf417decoder.DecodeContext import binarize_image
+from pdf417decoder.DecodeResult import DecodeResult
+from pdf417decoder.ImageSource import iter_pages
+
+class PrefetchPipeline:
+    """
+        Decode a sequence of images while the next ones are loaded and binarized ahead.
+        A loader thread reads the pages in order, a small thread pool binarizes them
+        and the caller thread locates and decodes. At most prefetch pages are waiting,
+        so any number of images is decoded in constant memory.
+    """
+
+    # seconds between checks of the stop flag while the queue is full
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, sources: Iterable, decoder: PDF417Decoder = None, prefetch: int = 4, workers: int = 2):
+        """
+        Args:
+            sources (Iterable): Image file paths, encoded image bytes, PIL images or NumPy arrays
+            decoder (PDF417Decoder, optional): Decoder. Defaults to a new decoder.
+            prefetch (int, optional): Pages loaded and binarized ahead. Defaults to 4.
+            workers (int, optional): Binarization threads. Defaults to 2.
+        """
+        self.sources = sources
+        self.decoder = PDF417Decoder() if decoder is None else decoder
+        self.prefetch = max(1, prefetch)
+        self.workers = max(1, workers)
+        self._local = threading.local()
+
+    def __iter__(self) -> Iterator[DecodeResult]:
+        executor = ThreadPoolExecutor(self.workers)
+        pending = queue.Queue(self.prefetch)
+        stop = threading.Event()
+        loader = threading.Thread(target=self._load, args=(executor, pending, stop), daemon=True)
+        loader.start()
+
+        try:
+            while (True):
+                item = pending.get()
+                if (item is None):
+                    break
+
+                source_index, page_index, future = item
+                yield self._decode(source_index, page_index, future)
+        finally:
+            # consumer finished or stopped early, release the loader and the pending pages
+            stop.set()
+            while (loader.is_alive()):
+                try:
+                    pending.get(timeout=self.POLL_INTERVAL)
+                except queue.Empty:
+                    pass
+            loader.join()
+            executor.shutdown(wait=True)
+
+    def _load(self, executor: ThreadPoolExecutor, pending: queue.Queue, stop: threading.Event):
+        """ Loader thread, reads pages in order and queues their binarization """
+        try:
+            for source_index, source in enumerate(self.sources):
+                page_index = 0
+                try:
+                    for page in iter_pages(source):
+                        if (not self._put(pending, stop, (source_index, page_index, executor.submit(self._binarize, page)))):
+                            return
+                        page_index += 1
+                except Exception as error:
+                    # report the unreadable source (or page) and go on with the next source
+                    future = Future()
+                    future.set_exception(error)
+                    if (not self._put(pending, stop, (source_index, page_index, future))):
+                        return
+        finally:
+            self._put(pending, stop, None)
+
+    def _put(self, pending: queue.Queue, stop: threading.Event, item) -> bool:
+        """ Wait for room in the queue, returns False once the consumer has stopped """
+        while (not stop.is_set()):
+            try:
+                pending.put(item, timeout=self.POLL_INTERVAL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _binarize(self, page) -> tuple:
+        """ Cache key of the page (None without a cache) and the binarized page """
+        # gray and black and white buffers are reused by each worker thread,
+        # the matrix is allocated per page since it waits in the queue
+        buffers = getattr(self._local, "buffers", None)
+        if (buffers is None):
+            buffers = dict()
+            self._local.buffers = buffers
+
+        # the cache key hashes the original pixels, computed here while they are at hand
+        key = None
+        if (self.decoder.cache is not None):
+            page = np.asarray(page)
+            key = self.decoder.cache_key(page)
+
+        return key, binarize_image(page, buffers, reuse_matrix=False)
+
+    def _decode(self, source_index: int, page_index: int, future: Future) -> DecodeResult:
+        try:
+            key, image_matrix = future.result()
+            result = self.decoder.decode_matrix(image_matrix, key)
+        except Exception as error:
+            result = DecodeResult()
+            result.error = repr(error)
+
+        result.source_index = source_index
+        result.page_index = page_index
+        return result
+
+def decode_iter(sources: Iterable, prefetch: int = 4, workers: int = 2, decoder: PDF417Decoder = None) -> Iterator[DecodeResult]:
+    """Decode images lazily, loading and binarizing the next pages while the current one is decoded
+
+    Args:
+        sources (Iterable): Image file paths, encoded image bytes, PIL images or NumPy arrays.
+            Every page of multi-frame images (TIFF) is decoded.
+        prefetch (int, optional): Pages loaded and binarized ahead. Defaults to 4.
+        workers (int, optional): Binarization threads. Defaults to 2.
+        decoder (PDF417Decoder, optional): Decoder. Defaults to a new decoder.
+            Its result cache is used, pages seen before are not decoded again.
+
+    Yields:
+        DecodeResult: Result per page in order, tagged with its source and page index.
+            Errors are reported in DecodeResult.error instead of being raised.
+    """
+    yield from PrefetchPipeline(sources, decoder, prefetch, workers)
@@ -0,0 +1,92 @@
+import multiprocessing
+from typing import Iterable, Iterator
+
+from pdf417decoder.Decoder import PDF417Decoder
+from pdf417decoder.DecodeResult import DecodeResult
+from pdf417decoder.ImageSource import load_image, transport_image
+
+# decoder of the current worker process, created once by the pool initializer
+_worker_decoder = None
+
+def _initialize_worker(verify_only: bool, time_budget: float = None, timings: bool = False, counters: bool = False):
+    """ Create the worker decoder, static and Galois field tables are built by the imports above """
+    global _worker_decoder
+    _worker_decoder = PDF417Decoder(verify_only=verify_only, time_budget=time_budget, timings=timings, counters=counters)
+
+def _decode_source(source) -> DecodeResult:
+    """ Decode one image in a worker, errors are returned with the result """
+    try:
+        return _worker_decoder.decode_image(load_image(source))
+    except Exception as error:
+        result = DecodeResult()
+        result.error = repr(error)
+        return result
+
+class DecoderPool:
+    """
+        Pool of worker processes decoding images.
+        Each worker imports the decoder and creates its tables once and keeps them for all images.
+    """
+
+    def __init__(self, workers: int = None, verify_only: bool = False, time_budget: float = None, timings: bool = False, counters: bool = False):
+        """
+        Args:
+            workers (int, optional): Number of worker processes. Defaults to the CPU count.
+            verify_only (bool, optional): Decoder verify only mode. Defaults to False.
+            time_budget (float, optional): Seconds allowed per image. Defaults to no limit.
+            timings (bool, optional): Record the stage timings of each image in DecodeResult.timings. Defaults to False.
+            counters (bool, optional): Count the hot path events of each image in DecodeResult.counters. Defaults to False.
+        """
+        self._pool = multiprocessing.Pool(workers, _initialize_worker, (verify_only, time_budget, timings, counters))
+
+    def decode_many(self, sources: Iterable, chunksize: int = 1) -> list:
+        """Decode images, returns a DecodeResult per image in order
+
+        Args:
+            sources (Iterable): Image file paths, encoded image bytes, PIL images or NumPy arrays
+            chunksize (int, optional): Images sent to a worker at once. Defaults to 1.
+        """
+        return self._pool.map(_decode_source, map(transport_image, sources), chunksize)
+
+    def imap(self, sources: Iterable, chunksize: int = 1) -> Iterator[DecodeResult]:
+        """Decode images, yields a DecodeResult per image in order as soon as it is available"""
+        return self._pool.imap(_decode_source, map(transport_image, sources), chunksize)
+
+    def close(self):
+        """ Wait for the pending images and stop the workers """
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self) -> 'DecoderPool':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if (exc_type is None):
+            self.close()
+        else:
+            self._pool.terminate()
+
+def decode_many(sources: Iterable, workers: int = None, chunksize: int = 1, verify_only: bool = False, time_budget: float = None, timings: bool = False,
+    counters: bool = False) -> list:
+    """Decode images in a pool of worker processes
+
+    Args:
+        sources (Iterable): Image file paths, encoded image bytes, PIL images or NumPy arrays
+        workers (int, optional): Number of worker processes. Defaults to the CPU count.
+        chunksize (int, optional): Images sent to a worker at once. Defaults to 1.
+        verify_only (bool, optional): Decoder verify only mode. Defaults to False.
+        time_budget (float, optional): Seconds allowed per image. Defaults to no limit.
+        timings (bool, optional): Record the stage timings of each image in DecodeResult.timings. Defaults to False.
+        counters (bool, optional): Count the hot path events of each image in DecodeResult.counters. Defaults to False.
+
+    Returns:
+        list: DecodeResult per image in order, errors are reported in DecodeResult.error
+    """
+    with DecoderPool(workers, verify_only, time_budget, timings, counters) as pool:
+        return pool.decode_many(sources, chunksize)
+
+def imap_decode(sources: Iterable, workers: int = None, chunksize: int = 1, verify_only: bool = False, time_budget: float = None,
+    timings: bool = False, counters: bool = False) -> Iterator[DecodeResult]:
+    """Decode images in a pool of worker processes, yielding results in order as they are available"""
+    with DecoderPool(workers, verify_only, time_budget, timings, counters) as pool:
+        yield from pool.imap(sources, chunksize)
@@ -0,0 +1,275 @@
+import abc
+import ast
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image as PIL
+
+from pdf417decoder.DecodeResult import DecodeResult
+from pdf417decoder.ErrorCorrection import ErrorCorrectionStatus
+from pdf417decoder.ResultRecord import macro_block_to_record, record_to_macro_block, record_to_result, result_to_record
+from pdf417decoder.Segment import SegmentType
+
+def image_key(input_image: PIL.Image, options: tuple = ()) -> str:
+    """Content hash of an image
+
+    Args:
+        input_image (Image): Barcode image bitmap or array
+        options (tuple, optional): Decoder options changing the result, part of the key
+    """
+    pixels = np.ascontiguousarray(np.asarray(input_image))
+
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(repr((pixels.shape, pixels.dtype.str, options)).encode("ascii"))
+    digest.update(memoryview(pixels).cast("B"))
+    return digest.hexdigest()
+
+def codewords_key(codewords: list, error_correction_length: int) -> str:
+    """ Hash of the raw codewords of a barcode (erasures are zero) and its error correction length """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(error_correction_length.to_bytes(2, "little"))
+    digest.update(np.asarray(codewords, dtype=np.uint16).tobytes())
+    return digest.hexdigest()
+
+class CachedCodewords:
+    """Error corrected codewords and decoded data of a raw codewords vector"""
+
+    def __init__(self, codewords: list, error_correction_count: int, error_correction_status, barcode_data: bytes,
+        segments: list, global_label_ids: tuple, macro_block):
+        self.codewords = codewords
+        self.error_correction_count = error_correction_count
+        self.error_correction_status = error_correction_status
+        self.barcode_data = barcode_data
+        # (segment type, length, GLI command, GLI value) of each segment in order
+        self.segments = segments
+        # character set, character set number, general purpose and user defined GLI values
+        self.global_label_ids = global_label_ids
+        self.macro_block = macro_block
+
+def codewords_to_record(cached: CachedCodewords) -> tuple:
+    """ Cached codewords as plain tuples, see ResultRecord """
+    return (tuple(int(codeword) for codeword in cached.codewords), cached.error_correction_count,
+        cached.error_correction_status.value if cached.error_correction_status is not None else None,
+        bytes(cached.barcode_data),
+        tuple((segment_type.value, length, gli_command, gli_value) for segment_type, length, gli_command, gli_value in cached.segments),
+        tuple(cached.global_label_ids), macro_block_to_record(cached.macro_block))
+
+def record_to_codewords(record: tuple) -> CachedCodewords:
+    """ Cached codewords from their record """
+    codewords, error_correction_count, status, barcode_data, segments, global_label_ids, macro_block = record
+
+    return CachedCodewords(list(codewords), error_correction_count, ErrorCorrectionStatus(status) if status is not None else None,
+        barcode_data, [(SegmentType(segment_type), length, gli_command, gli_value) for segment_type, length, gli_command, gli_value in segments],
+        global_label_ids, record_to_macro_block(macro_block))
+
+def value_to_record(value) -> tuple:
+    """
+        Decode result or cached codewords as a tagged record. Results are stored without
+        their timings and counters, they describe one decode and a cache hit is not a decode.
+    """
+    if (isinstance(value, DecodeResult)):
+        error, timed_out, barcodes, timings, counters = result_to_record(value)
+        return ("result", (error, timed_out, tuple(barcode[:-1] + (None,) for barcode in barcodes), None, None))
+
+    if (isinstance(value, CachedCodewords)):
+        return ("codewords", codewords_to_record(value))
+
+    raise TypeError("Only decode results and cached codewords can be stored: " + type(value).__name__)
+
+def record_to_value(record: tuple):
+    """ New value of a tagged record, callers never share the objects they get """
+    kind, record = record
+
+    if (kind == "result"):
+        return record_to_result(record)
+
+    if (kind == "codewords"):
+        return record_to_codewords(record)
+
+    raise ValueError("Unknown record kind: " + str(kind))
+
+class ResultCache(abc.ABC):
+    """
+        Base class of the decode result caches.
+        Values are kept as immutable records and built again by every get,
+        so callers may modify what they get without changing the cache.
+        Entries are evicted least recently used first beyond max_entries,
+        and expire ttl seconds after they were stored.
+    """
+
+    @property
+    def hit_ratio(self) -> float:
+        """ Hits over lookups, 0 before the first lookup """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def __init__(self, max_entries: int = 1024, ttl: float = None):
+        """
+        Args:
+            max_entries (int, optional): Entries kept. Defaults to 1024.
+            ttl (float, optional): Seconds an entry is valid. Defaults to no expiry.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """ Cached value or None """
+        with self._lock:
+            record = self._get(key)
+            value = None
+
+            if (record is not None):
+                try:
+                    value = record_to_value(record)
+                except (ValueError, TypeError):
+                    # not a record this version can read
+                    value = None
+
+            if (value is None):
+                self.misses += 1
+            else:
+                self.hits += 1
+
+            return value
+
+    def put(self, key: str, value):
+        record = value_to_record(value)
+
+        with self._lock:
+            self._put(key, record)
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    @abc.abstractmethod
+    def _get(self, key: str) -> tuple:
+        """ Cached record or None, called with the lock held """
+
+    @abc.abstractmethod
+    def _put(self, key: str, record: tuple):
+        """ Store a record, called with the lock held """
+
+    @abc.abstractmethod
+    def _clear(self):
+        """ Remove all entries, called with the lock held """
+
+class MemoryCache(ResultCache):
+    """ In memory cache of records, each hit builds a new value """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = None):
+        super().__init__(max_entries, ttl)
+        # key to (store time, value), least recently used first
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get(self, key: str):
+        entry = self._entries.get(key)
+
+        if (entry is None):
+            return None
+
+        if (self.ttl is not None and time.monotonic() - entry[0] > self.ttl):
+            del self._entries[key]
+            self.evictions += 1
+            return None
+
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def _put(self, key: str, record: tuple):
+        self._entries[key] = (time.monotonic(), record)
+        self._entries.move_to_end(key)
+
+        while (len(self._entries) > self.max_entries):
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _clear(self):
+        self._entries.clear()
+
+class SQLiteCache(ResultCache):
+    """
+        On disk cache in an SQLite database, shared by processes and kept across runs.
+        Values are stored as plain records read back with ast.literal_eval, never unpickled,
+        so a database from an untrusted source cannot run code.
+    """
+
+    def __init__(self, path: str, max_entries: int = 100000, ttl: float = None):
+        """
+        Args:
+            path (str): Database file path
+            max_entries (int, optional): Entries kept. Defaults to 100000.
+            ttl (float, optional): Seconds an entry is valid. Defaults to no expiry.
+        """
+        super().__init__(max_entries, ttl)
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("CREATE TABLE IF NOT EXISTS records (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, used REAL NOT NULL)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS records_used ON records (used)")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self) -> 'SQLiteCache':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _get(self, key: str):
+        row = self._connection.execute("SELECT value, created FROM records WHERE key = ?", (key,)).fetchone()
+
+        if (row is None):
+            return None
+
+        now = time.time()
+
+        if (self.ttl is not None and now - row[1] > self.ttl):
+            self._connection.execute("DELETE FROM records WHERE key = ?", (key,))
+            self.evictions += 1
+            return None
+
+        try:
+            record = ast.literal_eval(row[0])
+        except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+            # not a record this version can read, drop it
+            self._connection.execute("DELETE FROM records WHERE key = ?", (key,))
+            return None
+
+        self._connection.execute("UPDATE records SET used = ? WHERE key = ?", (now, key))
+        return record
+
+    def _put(self, key: str, record: tuple):
+        now = time.time()
+        self._connection.execute("INSERT OR REPLACE INTO records (key, value, created, used) VALUES (?, ?, ?, ?)",
+            (key, repr(record), now, now))
+
+        excess = self._connection.execute("SELECT COUNT(*) FROM records").fetchone()[0] - self.max_entries
+        if (excess > 0):
+            self._connection.execute("DELETE FROM records WHERE key IN (SELECT key FROM records ORDER BY used LIMIT ?)", (excess,))
+            self.evictions += excess
+
+    def _clear(self):
+        self._connection.execute("DELETE FROM records")
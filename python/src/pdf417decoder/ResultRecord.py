@@ -0,0 +1,106 @@
+from pdf417decoder.BarcodeInfo import BarcodeInfo
+from pdf417decoder.DecodeCounters import DecodeCounters
+from pdf417decoder.DecodeResult import DecodeResult
+from pdf417decoder.ErrorCorrection import ErrorCorrectionStatus
+from pdf417decoder.MacroBlock import MacroBlock
+from pdf417decoder.StageTimings import StageTimings
+
+# Records are tuples of plain values (None, bool, int, float, str, bytes), cheap to pickle
+# between processes and safe to store as text and read back with ast.literal_eval.
+
+def macro_block_to_record(macro_block: MacroBlock) -> tuple:
+    """ Macro PDF417 control block as a plain tuple, None if there is none """
+    if (macro_block is None):
+        return None
+
+    return (macro_block.segment_index, macro_block.file_id, macro_block.is_last_segment, macro_block.segment_count,
+        macro_block.file_name, macro_block.time_stamp, macro_block.sender, macro_block.addressee,
+        macro_block.file_size, macro_block.checksum)
+
+def record_to_macro_block(record: tuple) -> MacroBlock:
+    """ Macro PDF417 control block from its record """
+    if (record is None):
+        return None
+
+    macro_block = MacroBlock(record[0], record[1])
+    macro_block.is_last_segment = record[2]
+    macro_block.segment_count = record[3]
+    macro_block.file_name = record[4]
+    macro_block.time_stamp = record[5]
+    macro_block.sender = record[6]
+    macro_block.addressee = record[7]
+    macro_block.file_size = record[8]
+    macro_block.checksum = record[9]
+    return macro_block
+
+def timings_to_record(timings: StageTimings) -> tuple:
+    """ Stage timings as (stage, calls, seconds) tuples, None if not recorded """
+    if (timings is None):
+        return None
+
+    return tuple((stage, calls, seconds) for stage, (calls, seconds) in timings.stages.items())
+
+def record_to_timings(record: tuple) -> StageTimings:
+    """ Stage timings from their record """
+    if (record is None):
+        return None
+
+    timings = StageTimings()
+    for stage, calls, seconds in record:
+        timings.add(stage, seconds, calls)
+    return timings
+
+def counters_to_record(counters: DecodeCounters) -> tuple:
+    """ Counter values in DecodeCounters.FIELDS order, None if not counted """
+    if (counters is None):
+        return None
+
+    return tuple(getattr(counters, field) for field in DecodeCounters.FIELDS)
+
+def record_to_counters(record: tuple) -> DecodeCounters:
+    """ Decode counters from their record """
+    if (record is None):
+        return None
+
+    counters = DecodeCounters()
+    for field, value in zip(DecodeCounters.FIELDS, record):
+        setattr(counters, field, value)
+    return counters
+
+def result_to_record(result: DecodeResult) -> tuple:
+    """ Decode result as plain tuples, much cheaper to pickle than result objects """
+    barcodes = tuple((bytes(info.barcode_data) if info.barcode_data is not None else None, info.character_set,
+        info.gli_character_set_number, info.gli_general_purpose, info.gli_user_defined,
+        info.data_columns, info.data_rows, info.error_correction_length, info.error_correction_count,
+        info.error_correction_status.value if info.error_correction_status is not None else None,
+        macro_block_to_record(info.macro_block), counters_to_record(info.counters)) for info in result.barcodes_info)
+
+    return (result.error, result.timed_out, barcodes, timings_to_record(result.timings), counters_to_record(result.counters))
+
+def record_to_result(record: tuple) -> DecodeResult:
+    """ Decode result from a compact result record """
+    error, timed_out, barcodes, timings, counters = record
+
+    result = DecodeResult()
+    result.error = error
+    result.timed_out = timed_out
+    result.timings = record_to_timings(timings)
+    result.counters = record_to_counters(counters)
+
+    for barcode in barcodes:
+        info = BarcodeInfo()
+        info.barcode_data = bytearray(barcode[0]) if barcode[0] is not None else None
+        info.character_set = barcode[1]
+        info.gli_character_set_number = barcode[2]
+        info.gli_general_purpose = barcode[3]
+        info.gli_user_defined = barcode[4]
+        info.data_columns = barcode[5]
+        info.data_rows = barcode[6]
+        info.error_correction_length = barcode[7]
+        info.error_correction_count = barcode[8]
+        info.error_correction_status = ErrorCorrectionStatus(barcode[9]) if barcode[9] is not None else None
+        info.macro_block = record_to_macro_block(barcode[10])
+        info.counters = record_to_counters(barcode[11])
+        result.barcodes_info.append(info)
+
+    return result
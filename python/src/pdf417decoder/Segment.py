@@ -0,0 +1,66 @@
+from enum import Enum, auto
+
+class SegmentType(Enum):
+    TEXT = auto()
+    BYTE = auto()
+    NUMERIC = auto()
+    GLI = auto()
+
+class Segment:
+    """Decoded data segment of one barcode"""
+
+    @property
+    def segment_type(self) -> SegmentType:
+        """ Segment type (text, byte, numeric or global label identifier) """
+        return self._segment_type
+
+    @segment_type.setter
+    def segment_type(self, value: SegmentType):
+        self._segment_type = value
+
+    @property
+    def data(self) -> memoryview:
+        """
+            Segment bytes, a view over the conversion buffer of the barcode (not over
+            BarcodeInfo.barcode_data, which is a copy). The view keeps the buffer alive.
+            Empty for global label identifier segments.
+        """
+        return self._data
+
+    @data.setter
+    def data(self, value: memoryview):
+        self._data = value
+
+    @property
+    def barcode_index(self) -> int:
+        """ Index of the barcode the segment belongs to """
+        return self._barcode_index
+
+    @barcode_index.setter
+    def barcode_index(self, value: int):
+        self._barcode_index = value
+
+    @property
+    def gli_command(self) -> int:
+        """ Global label identifier codeword (925, 926 or 927) or None """
+        return self._gli_command
+
+    @gli_command.setter
+    def gli_command(self, value: int):
+        self._gli_command = value
+
+    @property
+    def gli_value(self) -> int:
+        """ Global label identifier value or None """
+        return self._gli_value
+
+    @gli_value.setter
+    def gli_value(self, value: int):
+        self._gli_value = value
+
+    def __init__(self, segment_type: SegmentType, data: memoryview, barcode_index: int, gli_command: int = None, gli_value: int = None):
+        self.segment_type = segment_type
+        self.data = data
+        self.barcode_index = barcode_index
+        self.gli_command = gli_command
+        self.gli_value = gli_value
@@ -0,0 +1,174 @@
+import collections
+import multiprocessing
+import numpy as np
+from typing import Iterable, Iterator
+
+from pdf417decoder.Decoder import PDF417Decoder
+from pdf417decoder.DecodeResult import DecodeResult
+from pdf417decoder.ImageSource import load_image
+from pdf417decoder.ResultRecord import record_to_result, result_to_record
+
+# decoder and attached shared memory slots of the current worker process
+_worker_decoder = None
+_worker_slots = dict()
+
+def _initialize_worker(verify_only: bool, time_budget: float, timings: bool = False, counters: bool = False):
+    """ Create the worker decoder once, frames arrive in shared memory slots """
+    global _worker_decoder
+    _worker_decoder = PDF417Decoder(verify_only=verify_only, time_budget=time_budget, timings=timings, counters=counters)
+
+def _attach_slot(slot_index: int, name: str):
+    """ Shared memory of a slot, attached once per worker and again when the slot was resized """
+    from multiprocessing import shared_memory
+
+    attached = _worker_slots.get(slot_index)
+    if (attached is not None and attached.name == name):
+        return attached
+
+    if (attached is not None):
+        attached.close()
+
+    # the parent owns and unlinks the slots. Before Python 3.13 attaching registers the
+    # name again with the resource tracker the workers share with the parent, which is harmless
+    try:
+        attached = shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        attached = shared_memory.SharedMemory(name)
+    _worker_slots[slot_index] = attached
+    return attached
+
+def _error_record(error: Exception) -> tuple:
+    """ Result record of a frame that could not be loaded or decoded """
+    return (repr(error), False, (), None, None)
+
+def _decode_slot(descriptor: tuple) -> tuple:
+    """ Decode the frame in a slot, returns a compact result record """
+    slot_index, name, shape, dtype = descriptor
+
+    try:
+        slot = _attach_slot(slot_index, name)
+        frame = np.ndarray(shape, dtype=dtype, buffer=slot.buf)
+        return result_to_record(_worker_decoder.decode_image(frame))
+    except Exception as error:
+        return _error_record(error)
+
+class SharedMemoryPool:
+    """
+        Pool of worker processes decoding frames passed through shared memory.
+        Each frame is copied once into a free ring slot and workers get only the slot
+        descriptor (slot, shared memory name, shape and type), they decode a NumPy view
+        over the slot. Results come back as compact records. A slot is reused once its
+        result was taken, so at most slots frames are in flight.
+        Requires Python 3.8 or later (multiprocessing.shared_memory).
+    """
+
+    def __init__(self, workers: int = None, slots: int = None, slot_bytes: int = 8 * 1024 * 1024,
+        verify_only: bool = False, time_budget: float = None, timings: bool = False, counters: bool = False):
+        """
+        Args:
+            workers (int, optional): Number of worker processes. Defaults to the CPU count.
+            slots (int, optional): Ring slots, frames in flight. Defaults to twice the workers.
+            slot_bytes (int, optional): Initial size of a slot, slots grow for larger frames. Defaults to 8 MB.
+            verify_only (bool, optional): Decoder verify only mode. Defaults to False.
+            time_budget (float, optional): Seconds allowed per image. Defaults to no limit.
+            timings (bool, optional): Record the stage timings of each frame in DecodeResult.timings. Defaults to False.
+            counters (bool, optional): Count the hot path events of each frame in DecodeResult.counters. Defaults to False.
+        """
+        from multiprocessing import shared_memory
+        self._shared_memory = shared_memory
+
+        workers = multiprocessing.cpu_count() if workers is None else workers
+        self.slots_count = 2 * workers if slots is None else slots
+        self._slots = [shared_memory.SharedMemory(create=True, size=slot_bytes) for index in range(self.slots_count)]
+        self._free_slots = collections.deque(range(self.slots_count))
+        self._pool = multiprocessing.Pool(workers, _initialize_worker, (verify_only, time_budget, timings, counters))
+
+    def imap(self, sources: Iterable) -> Iterator[DecodeResult]:
+        """Decode frames, yields a DecodeResult per frame in order
+
+        Args:
+            sources (Iterable): NumPy arrays, PIL images, image file paths or encoded image bytes.
+                Files are loaded by this process, the workers only see pixels. A source that can not
+                be loaded gets a result with its error, in order, like a frame the worker fails to decode.
+        """
+        # (slot index, async result) of the frames in flight, oldest first.
+        # Sources that could not be loaded wait in order as (None, error record)
+        pending = collections.deque()
+
+        try:
+            for source in sources:
+                # error entries free no slot, take results until one is free
+                while (len(self._free_slots) == 0):
+                    yield self._take(pending)
+
+                try:
+                    frame = np.ascontiguousarray(np.asarray(load_image(source)))
+                except Exception as error:
+                    pending.append((None, _error_record(error)))
+                    continue
+
+                slot_index = self._free_slots.popleft()
+                pending.append((slot_index, self._pool.apply_async(_decode_slot, (self._put_frame(slot_index, frame),))))
+
+            while (len(pending) > 0):
+                yield self._take(pending)
+        finally:
+            # slots of abandoned frames are usable once their workers are done
+            for slot_index, async_result in pending:
+                if (slot_index is not None):
+                    async_result.wait()
+                    self._free_slots.append(slot_index)
+
+    def decode_many(self, sources: Iterable) -> list:
+        """ Decode frames, returns a DecodeResult per frame in order """
+        return list(self.imap(sources))
+
+    def _put_frame(self, slot_index: int, frame: np.ndarray) -> tuple:
+        """ Copy a frame into a slot, returns the slot descriptor """
+        slot = self._slots[slot_index]
+
+        if (slot.size < frame.nbytes):
+            slot.close()
+            slot.unlink()
+            slot = self._shared_memory.SharedMemory(create=True, size=frame.nbytes)
+            self._slots[slot_index] = slot
+
+        np.ndarray(frame.shape, dtype=frame.dtype, buffer=slot.buf)[...] = frame
+        return (slot_index, slot.name, frame.shape, frame.dtype.str)
+
+    def _take(self, pending: collections.deque) -> DecodeResult:
+        slot_index, async_result = pending.popleft()
+
+        if (slot_index is None):
+            return record_to_result(async_result)
+
+        try:
+            return record_to_result(async_result.get())
+        finally:
+            self._free_slots.append(slot_index)
+
+    def close(self):
+        """ Stop the workers and release the shared memory """
+        self._pool.close()
+        self._pool.join()
+        self._release()
+
+    def terminate(self):
+        self._pool.terminate()
+        self._pool.join()
+        self._release()
+
+    def _release(self):
+        for slot in self._slots:
+            slot.close()
+            slot.unlink()
+        self._slots = list()
+
+    def __enter__(self) -> 'SharedMemoryPool':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if (exc_type is None):
+            self.close()
+        else:
+            self.terminate()
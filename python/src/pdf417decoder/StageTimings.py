@@ -0,0 +1,84 @@
+import time
+from typing import Callable, Iterator
+
+class StageTimings:
+    """
+        Wall time and call count of each decode stage.
+        Stages nest: locate_barcodes includes rescan_rotated and get_codewords includes error_correction.
+        codewords_to_data counts the time spent converting, not the time spent by the segment consumer.
+    """
+
+    STAGES = ("convert_image", "locate_barcodes", "rescan_rotated", "left_indicators", "right_indicators",
+        "set_trans_matrix", "get_codewords", "error_correction", "codewords_to_data")
+
+    # stages timed on generator methods of another name, the other stages are methods of the same name
+    GENERATOR_STAGES = {"codewords_to_data": ("codewords_to_segments", "cached_segments")}
+
+    def __init__(self):
+        # stage name to [calls, seconds]
+        self.stages = dict()
+
+    def add(self, stage: str, seconds: float, calls: int = 1):
+        entry = self.stages.get(stage)
+
+        if (entry is None):
+            self.stages[stage] = [calls, seconds]
+        else:
+            entry[0] += calls
+            entry[1] += seconds
+
+    def calls(self, stage: str) -> int:
+        entry = self.stages.get(stage)
+        return 0 if entry is None else entry[0]
+
+    def seconds(self, stage: str) -> float:
+        entry = self.stages.get(stage)
+        return 0.0 if entry is None else entry[1]
+
+    def merge(self, other: 'StageTimings'):
+        """ Add the timings of another image, to aggregate a batch """
+        for stage, (calls, seconds) in other.stages.items():
+            self.add(stage, seconds, calls)
+
+    def as_dict(self) -> dict:
+        """ Stage name to {"calls": count, "seconds": wall time} """
+        return {stage: {"calls": calls, "seconds": seconds} for stage, (calls, seconds) in self.stages.items()}
+
+    def timed(self, stage: str, method: Callable) -> Callable:
+        """ Wrap a method to add its time to a stage """
+        def timed_method(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - start)
+
+        return timed_method
+
+    def timed_generator(self, stage: str, method: Callable) -> Callable:
+        """ Wrap a generator method to add the time of each step to a stage """
+        def timed_method(*args, **kwargs) -> Iterator:
+            generator = method(*args, **kwargs)
+            seconds = 0.0
+
+            try:
+                while (True):
+                    start = time.perf_counter()
+                    try:
+                        item = next(generator)
+                    except StopIteration:
+                        return
+                    finally:
+                        seconds += time.perf_counter() - start
+                    yield item
+            finally:
+                generator.close()
+                self.add(stage, seconds)
+
+        return timed_method
+
+    def __str__(self) -> str:
+        lines = list()
+        for stage, (calls, seconds) in self.stages.items():
+            lines.append("{0:<18} {1:>8} calls {2:>10.3f} ms".format(stage, calls, 1000 * seconds))
+        return "\n".join(lines)
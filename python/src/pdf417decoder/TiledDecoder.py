@@ -0,0 +1,276 @@
+import copy
+import os
+import time
+import numpy as np
+import cv2
+from PIL import Image as PIL
+
+from pdf417decoder.BorderSymbol import BorderSymbol
+from pdf417decoder.Decoder import PDF417Decoder
+from pdf417decoder.DecodeContext import DecodeContext
+from pdf417decoder.DecodeCounters import DecodeCounters
+from pdf417decoder.DecodeResult import DecodeResult
+from pdf417decoder.StageTimings import StageTimings
+
+def open_raster(path: os.PathLike, shape: tuple = None, dtype: type = np.uint8, offset: int = 0) -> np.memmap:
+    """Memory map a grayscale raster file without reading it
+
+    Args:
+        path (PathLike): Raw raster or TIFF file path
+        shape (tuple, optional): (height, width) of a raw raster. Defaults to reading a TIFF header.
+        dtype (type, optional): Pixel type of a raw raster. Defaults to 8 bits.
+        offset (int, optional): Offset of the pixels in a raw raster file. Defaults to 0.
+
+    Raises:
+        ValueError: The TIFF pixels are not stored as one uncompressed 8 bit grayscale block
+    """
+    if (shape is not None):
+        return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
+
+    with PIL.open(path) as image:
+        width, height = image.size
+        tiles = image.tile
+
+        if (image.mode != "L" or len(tiles) == 0):
+            raise ValueError("Only 8 bit grayscale TIFF images can be memory mapped")
+
+        # strips must be uncompressed and follow each other in the file
+        first_offset = tiles[0][2]
+        for decoder_name, box, tile_offset, args in tiles:
+            if (decoder_name != "raw" or box[0] != 0 or box[2] != width or tile_offset != first_offset + box[1] * width):
+                raise ValueError("Only uncompressed contiguous TIFF images can be memory mapped")
+
+            # one byte per pixel, not packed (L;4), inverted (L;I) or padded rows
+            if (not isinstance(args, tuple) or len(args) == 0 or args[0] != "L" or (len(args) > 1 and args[1] not in (0, width))):
+                raise ValueError("Only 8 bit grayscale TIFF images can be memory mapped")
+
+    return np.memmap(path, dtype=np.uint8, mode="r", offset=first_offset, shape=(height, width))
+
+def raster_histogram(raster: np.ndarray, band_rows: int = 1024) -> np.ndarray:
+    """ Gray level histogram of an 8 bit raster computed one band of rows at a time """
+    histogram = np.zeros(256, dtype=np.int64)
+
+    # OpenCV counts the band in place (np.bincount would make a 64 bit copy of it)
+    # in 32 bit floats, exact up to 2^24 pixels per band
+    band_rows = max(1, min(band_rows, (1 << 24) // max(1, raster.shape[1])))
+
+    for top in range(0, raster.shape[0], band_rows):
+        band = np.ascontiguousarray(raster[top:top + band_rows])
+        histogram += cv2.calcHist([band], [0], None, [256], [0, 256]).ravel().astype(np.int64)
+
+    return histogram
+
+def otsu_threshold(histogram: np.ndarray) -> int:
+    """ Otsu threshold of a gray level histogram, pixels at or below it are black (as OpenCV THRESH_OTSU) """
+    levels = np.arange(len(histogram), dtype=np.float64)
+    weight_black = np.cumsum(histogram, dtype=np.float64)
+    weight_white = weight_black[-1] - weight_black
+    sum_black = np.cumsum(histogram * levels)
+    sum_total = sum_black[-1]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_black = sum_black / weight_black
+        mean_white = (sum_total - sum_black) / weight_white
+        variance = weight_black * weight_white * (mean_black - mean_white) ** 2
+
+    variance[~np.isfinite(variance)] = -1.0
+    return int(np.argmax(variance))
+
+class TiledDecoder:
+    """
+        Decode very large images (memory mapped rasters) one tile at a time.
+        The binarization threshold is computed for the whole image from a histogram
+        read in bands. Tiles are binarized and scanned for start and stop symbols,
+        each tile overlapping its neighbours by a border pattern width. The symbols
+        of all tiles are grouped into border lines in row order, so borders crossing
+        tile edges are stitched as in a whole image scan. Each barcode is then
+        decoded from a window around its borders. Peak memory is bounded by the
+        tile and window sizes, not by the image size.
+        The image being decoded is kept on the object, a TiledDecoder decodes one
+        image at a time and must not be shared by threads (decode_tiled creates one per call).
+    """
+
+    def __init__(self, decoder: PDF417Decoder = None, tile_size: int = 2048, overlap: int = 256, margin: int = 64):
+        """
+        Args:
+            decoder (PDF417Decoder, optional): Decoder options. Defaults to a new decoder.
+            tile_size (int, optional): Tile width and height in pixels. Defaults to 2048.
+            overlap (int, optional): Pixels scanned beyond each side of a tile, must be more than
+                the width of a start or stop pattern. Defaults to 256.
+            margin (int, optional): Pixels added around the borders of a barcode to decode it. Defaults to 64.
+        """
+        self.decoder = PDF417Decoder() if decoder is None else decoder
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.margin = margin
+
+    def decode(self, raster: np.ndarray) -> DecodeResult:
+        """Decode a grayscale raster
+
+        Args:
+            raster (ndarray): 8 bit grayscale image, typically a np.memmap from open_raster
+
+        Returns:
+            DecodeResult: Decoded barcodes
+        """
+        self.raster = raster
+        self.height, self.width = raster.shape[:2]
+        self.threshold = otsu_threshold(raster_histogram(raster))
+        self.deadline = None if self.decoder.time_budget is None else time.monotonic() + self.decoder.time_budget
+        self.result = DecodeResult()
+        # stage timings of all tiles and windows, reported once for the image
+        self.result.timings = StageTimings() if self.decoder.record_timings else None
+        self.result.counters = DecodeCounters() if self.decoder.record_counters else None
+
+        # as locate_barcodes, try upside down if no barcode is found
+        for rotated in (False, True):
+            self.rotated = rotated
+            candidates = self.locate_candidates()
+
+            if (len(candidates) > 0 or self.result.timed_out):
+                break
+
+        for barcode_area, window in candidates:
+            if (self.decoder.max_barcodes is not None and len(self.result) >= self.decoder.max_barcodes):
+                break
+
+            self.decode_window(barcode_area, window)
+
+            if (self.result.timed_out):
+                break
+
+        if (self.decoder.timings_callback is not None):
+            self.decoder.timings_callback(self.result.timings)
+
+        return self.result
+
+    def expired(self) -> bool:
+        if (self.deadline is not None and time.monotonic() >= self.deadline):
+            self.result.timed_out = True
+
+        return self.result.timed_out
+
+    def read_region(self, left: int, top: int, right: int, bottom: int) -> np.ndarray:
+        """ Binarized region of the image as scanned (upside down in the second pass), with a white column at the left """
+        if (self.rotated):
+            pixels = self.raster[self.height - bottom:self.height - top, self.width - right:self.width - left][::-1, ::-1]
+        else:
+            pixels = self.raster[top:bottom, left:right]
+
+        matrix = np.zeros((bottom - top, right - left + 1), dtype=bool)
+        np.less_equal(pixels, self.threshold, out=matrix[:, 1:])
+        return matrix
+
+    def locate_candidates(self) -> list:
+        """ Barcode areas of the whole image and the window to decode each of them """
+        # border symbols lists and the context matching them
+        start_symbols = list()
+        stop_symbols = list()
+
+        with DecodeContext(self.decoder, None) as context:
+            for top in range(0, self.height, self.tile_size):
+                bottom = min(self.height, top + self.tile_size)
+                band_start = list()
+                band_stop = list()
+
+                for left in range(0, self.width, self.tile_size):
+                    if (self.expired()):
+                        return list()
+
+                    right = min(self.width, left + self.tile_size)
+                    self.scan_tile(left, top, right, bottom, band_start, band_stop)
+
+                # group the symbols of the band in row order like a whole image scan
+                for band_symbols, border_symbols in ((band_start, start_symbols), (band_stop, stop_symbols)):
+                    band_symbols.sort(key=lambda symbol: (symbol.y1, symbol.x1))
+                    for symbol in band_symbols:
+                        context.add_border_symbol(border_symbols, symbol, symbol.y1)
+
+            # remove all lists with less than 18 symbols
+            start_symbols = [symbols for symbols in start_symbols if (len(symbols) >= 18)]
+            stop_symbols = [symbols for symbols in stop_symbols if (len(symbols) >= 18)]
+
+            candidates = list()
+            context.barcode_list = list()
+
+            for start_list in start_symbols:
+                for stop_list in stop_symbols:
+                    if (context.match_start_and_stop(start_list, stop_list)):
+                        candidates.append((context.barcode_list[-1], self.barcode_window(start_list, stop_list)))
+
+            self.add_counters(context)
+            return candidates
+
+    def scan_tile(self, left: int, top: int, right: int, bottom: int, band_start: list, band_stop: list):
+        """ Scan the rows of a tile, keeping the symbols starting inside it (not in the overlap) """
+        scan_left = max(0, left - self.overlap)
+        scan_right = min(self.width, right + self.overlap)
+
+        # the context gives its scratch buffers back to the decoder for the next tile
+        with DecodeContext(self.decoder, None, self.read_region(scan_left, top, scan_right, bottom)) as context:
+            context.convert_image()
+            context.prepare_scan()
+
+            # tile matrix column to image column
+            delta_x = scan_left - 1
+
+            for row in range(bottom - top):
+                start_list, stop_list = context.row_border_symbols(row)
+
+                for symbols, band_symbols in ((start_list, band_start), (stop_list, band_stop)):
+                    for symbol in symbols:
+                        x1 = symbol.x1 + delta_x
+                        if (left <= x1 < right):
+                            band_symbols.append(BorderSymbol(x1, top + row, symbol.x2 + delta_x))
+
+            self.add_timings(context)
+            self.add_counters(context)
+
+    def barcode_window(self, start_list: list, stop_list: list) -> tuple:
+        """ Image window holding the start and stop borders plus the margin """
+        left = min(symbol.x1 for symbol in start_list)
+        right = max(symbol.x2 for symbol in stop_list)
+        top = min(min(symbol.y1 for symbol in start_list), min(symbol.y1 for symbol in stop_list))
+        bottom = max(max(symbol.y1 for symbol in start_list), max(symbol.y1 for symbol in stop_list)) + 1
+
+        return (max(0, left - self.margin), max(0, top - self.margin),
+            min(self.width, right + self.margin), min(self.height, bottom + self.margin))
+
+    def decode_window(self, barcode_area, window: tuple):
+        """ Decode one barcode area from its window """
+        left, top, right, bottom = window
+
+        # barcode area relative to the window matrix
+        window_area = copy.copy(barcode_area)
+        window_area.translate(1 - left, -top)
+
+        context = DecodeContext(self.decoder, None, self.read_region(left, top, right, bottom), [window_area], self.deadline)
+        context.timings_callback = None
+        window_result = context.decode()
+        self.add_timings(context)
+        self.add_counters(context)
+
+        self.result.barcodes_info.extend(window_result.barcodes_info)
+        if (window_result.timed_out):
+            self.result.timed_out = True
+
+    def add_timings(self, context: DecodeContext):
+        """ Add the stage timings of a tile or window context to the image timings """
+        if (context.timings is not None):
+            self.result.timings.merge(context.timings)
+
+    def add_counters(self, context: DecodeContext):
+        """ Add the event counters of a tile, window or matching context to the image counters """
+        if (context.counters is not None):
+            self.result.counters.merge(context.counters)
+
+def decode_tiled(source, tile_size: int = 2048, decoder: PDF417Decoder = None) -> DecodeResult:
+    """Decode a very large grayscale image tile by tile
+
+    Args:
+        source: TIFF file path (str or PathLike, uncompressed 8 bit grayscale) or a 2D array such as a np.memmap
+        tile_size (int, optional): Tile width and height in pixels. Defaults to 2048.
+        decoder (PDF417Decoder, optional): Decoder options. Defaults to a new decoder.
+    """
+    raster = open_raster(source) if isinstance(source, (str, os.PathLike)) else source
+    return TiledDecoder(decoder, tile_size).decode(raster)
@@ -0,0 +1,217 @@
+import copy
+import time
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image as PIL
+
+from pdf417decoder.BarcodeArea import BarcodeArea
+from pdf417decoder.Decoder import PDF417Decoder
+from pdf417decoder.DecodeContext import DecodeContext, binarize_image, scratch_buffer
+from pdf417decoder.DecodeResult import DecodeResult
+
+class TrackedBarcode:
+    """Geometry of a barcode decoded in the previous frame"""
+
+    def __init__(self, barcode_area: BarcodeArea, corners: tuple, previous: 'TrackedBarcode' = None):
+        self.barcode_area = barcode_area
+        self.corners = corners
+
+        # motion since the previous frame, the next frame is expected to move the same way
+        self.velocity_x = 0
+        self.velocity_y = 0
+        if (previous is not None):
+            self.velocity_x = round(sum(corner[0] - old[0] for corner, old in zip(corners, previous.corners)) / 4)
+            self.velocity_y = round(sum(corner[1] - old[1] for corner, old in zip(corners, previous.corners)) / 4)
+
+    def predicted_area(self) -> BarcodeArea:
+        """ Barcode area moved by the last frame motion """
+        barcode_area = copy.copy(self.barcode_area)
+        barcode_area.translate(self.velocity_x, self.velocity_y)
+        return barcode_area
+
+    def window(self, margin: int, width: int, height: int) -> tuple:
+        """ Image window around the barcode including start and stop patterns plus a margin """
+        x_values = [corner[0] + self.velocity_x for corner in self.corners]
+        y_values = [corner[1] + self.velocity_y for corner in self.corners]
+
+        # indicator codewords are next to the start and stop patterns
+        border = int(2 * self.barcode_area.average_symbol_width) + margin
+
+        left = max(0, min(x_values) - border)
+        top = max(0, min(y_values) - margin)
+        right = min(width, max(x_values) + border)
+        bottom = min(height, max(y_values) + margin)
+        return left, top, right, bottom
+
+class TrackingSession:
+    """
+        Decode a stream of video or camera frames where barcodes move little between frames.
+        Barcodes of the previous frame are tried first with their previous geometry,
+        then by scanning a small window around it. The whole frame is scanned when
+        a barcode is lost, and every rescan_interval frames to find barcodes entering
+        the frame. Payloads reported in recent frames are skipped.
+    """
+
+    def __init__(self, decoder: PDF417Decoder = None, margin: int = 24, skip_duplicates: bool = True, history: int = 64, rescan_interval: int = 10):
+        """
+        Args:
+            decoder (PDF417Decoder, optional): Decoder. Defaults to a new decoder.
+            margin (int, optional): Pixels a barcode may move between frames. Defaults to 24.
+            skip_duplicates (bool, optional): Report each payload once. Defaults to True.
+            history (int, optional): Number of recent payloads remembered to skip duplicates. Defaults to 64.
+            rescan_interval (int, optional): Tracked frames between full scans for new barcodes, None to scan only when a barcode is lost. Defaults to 10.
+        """
+        self.decoder = PDF417Decoder() if decoder is None else decoder
+        self.margin = margin
+        self.skip_duplicates = skip_duplicates
+        self.history = history
+        self.rescan_interval = rescan_interval
+        self.tracked = list()
+        self.rotated = False
+        self.tracked_frames = 0
+        self.full_scans = 0
+        self._frames_since_scan = 0
+        self._recent_payloads = OrderedDict()
+
+    def decode(self, frame: PIL.Image) -> DecodeResult:
+        """Decode one frame
+
+        Args:
+            frame (Image): Frame bitmap or array
+
+        Returns:
+            DecodeResult: Barcodes of the frame, without payloads already reported when skipping duplicates
+        """
+        result = None
+
+        # one time budget for the whole frame, shared by all tracked barcodes
+        deadline = None
+        if (self.decoder.time_budget is not None):
+            deadline = time.monotonic() + self.decoder.time_budget
+
+        # the whole frame is scanned from time to time for barcodes entering it
+        rescan_due = (self.rescan_interval is not None and self._frames_since_scan >= self.rescan_interval)
+
+        if (len(self.tracked) > 0 and not rescan_due):
+            result = self.track(frame, deadline)
+
+        if (result is None):
+            result = self.full_scan(frame, deadline)
+        else:
+            self.tracked_frames += 1
+            self._frames_since_scan += 1
+
+        if (self.skip_duplicates):
+            result.barcodes_info = [barcode_info for barcode_info in result.barcodes_info if (self.is_new_payload(barcode_info.barcode_data))]
+
+        return result
+
+    def track(self, frame: PIL.Image, deadline: float = None) -> DecodeResult:
+        """ Decode the tracked barcodes around their previous geometry, None if one of them is lost """
+        buffers = self.decoder.borrow_buffers()
+        try:
+            return self.track_matrix(binarize_image(frame, buffers), buffers, deadline)
+        finally:
+            self.decoder.return_buffers(buffers)
+
+    def track_matrix(self, image_matrix: np.ndarray, buffers: dict, deadline: float = None) -> DecodeResult:
+        """ Decode the tracked barcodes in a binarized frame, None if one of them is lost """
+        if (deadline is None and self.decoder.time_budget is not None):
+            deadline = time.monotonic() + self.decoder.time_budget
+
+        # tracked geometry is relative to the image as scanned, upside down or not
+        if (self.rotated):
+            rotated_matrix = scratch_buffer(buffers, "tracking", image_matrix.shape, bool)
+            np.copyto(rotated_matrix, image_matrix[::-1, ::-1])
+            image_matrix = rotated_matrix
+
+        result = DecodeResult()
+        tracked = list()
+
+        for tracked_barcode in self.tracked:
+            # barcode area of the previous frame moved by the last motion
+            context = DecodeContext(self.decoder, None, image_matrix, [tracked_barcode.predicted_area()], deadline)
+            context.decode()
+
+            # out of time is not lost, the barcode is tried again in the next frame
+            if (context.timed_out and len(context.barcodes_info) == 0):
+                result.timed_out = True
+                tracked.append(tracked_barcode)
+                continue
+
+            if (len(context.barcodes_info) == 0):
+                context = self.scan_window(image_matrix, tracked_barcode, deadline)
+                if (context is None):
+                    return None
+
+            result.barcodes_info.extend(context.barcodes_info)
+            tracked.extend(TrackedBarcode(barcode_area, corners, tracked_barcode) for barcode_area, corners in context.barcodes_geometry)
+
+        self.tracked = tracked
+        return result
+
+    def scan_window(self, image_matrix: np.ndarray, tracked_barcode: TrackedBarcode, deadline: float = None) -> DecodeContext:
+        """ Locate and decode the barcode in a window around its previous geometry, None if not found """
+        height, width = image_matrix.shape
+        left, top, right, bottom = tracked_barcode.window(self.margin, width, height)
+
+        if (right - left < 2 or bottom - top < 2):
+            return None
+
+        # the window gets a white column at the left like a binarized image
+        window = np.zeros((bottom - top, right - left + 1), dtype=bool)
+        window[:, 1:] = image_matrix[top:bottom, left:right]
+
+        context = DecodeContext(self.decoder, None, window, deadline=deadline)
+        context.decode()
+
+        # found nothing, or only upside down in the window
+        if (len(context.barcodes_info) == 0 or context.rotated):
+            return None
+
+        # map the geometry back to the full image
+        delta_x = left - 1
+        delta_y = top
+        for barcode_area, corners in context.barcodes_geometry:
+            barcode_area.translate(delta_x, delta_y)
+
+        context.barcodes_geometry = [(barcode_area, tuple((x + delta_x, y + delta_y) for x, y in corners)) for barcode_area, corners in context.barcodes_geometry]
+        return context
+
+    def full_scan(self, frame: PIL.Image, deadline: float = None) -> DecodeResult:
+        """ Locate the barcodes in the whole frame and start tracking them """
+        self.full_scans += 1
+        self._frames_since_scan = 0
+
+        context = DecodeContext(self.decoder, frame, deadline=deadline)
+        result = context.decode()
+
+        self.rotated = context.rotated
+        self.tracked = [TrackedBarcode(barcode_area, corners) for barcode_area, corners in context.barcodes_geometry]
+        return result
+
+    def is_new_payload(self, payload: bytearray) -> bool:
+        """ Remember the payload, returns False if it was reported in a recent frame """
+        # barcodes with errors in verify only mode have no payload
+        if (payload is None):
+            return True
+
+        key = bytes(payload)
+
+        if (key in self._recent_payloads):
+            self._recent_payloads.move_to_end(key)
+            return False
+
+        self._recent_payloads[key] = True
+        if (len(self._recent_payloads) > self.history):
+            self._recent_payloads.popitem(last=False)
+
+        return True
+
+    def reset(self):
+        """ Forget the tracked barcodes and the reported payloads """
+        self.tracked = list()
+        self.rotated = False
+        self._frames_since_scan = 0
+        self._recent_payloads.clear()
@@ -1,3 +1,5 @@
 from pdf417decoder.Decoder import PDF417Decoder
+from pdf417decoder.ProcessPool import decode_many
+from pdf417decoder.Pipeline import decode_iter
 
-__all__ = [PDF417Decoder]
\ No newline at end of file
+__all__ = [PDF417Decoder, decode_many, decode_iter]
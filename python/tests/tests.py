@@ -1,7 +1,31 @@
+import asyncio
+import os
+import pickle
 import pytest
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
+import numpy as np
 from PIL import Image as PIL
-from pdf417decoder import PDF417Decoder
+import pdf417decoder.ErrorCorrection
+from pdf417decoder import PDF417Decoder, decode_many, decode_iter
+from pdf417decoder.DecodeContext import DecodeContext
+from pdf417decoder.DecodeResult import DecodeResult
+from pdf417decoder.AsyncDecoder import AsyncDecoder
+from pdf417decoder.TrackingSession import TrackingSession
+from pdf417decoder.ResultCache import MemoryCache, SQLiteCache
+from pdf417decoder.SharedMemoryPool import SharedMemoryPool
+from pdf417decoder.TiledDecoder import decode_tiled, open_raster
+from pdf417decoder.Encoder import BAR_PATTERNS, encode, render, encode_image
+from pdf417decoder.ErrorCorrection import ErrorCorrectionStatus
+from pdf417decoder.Segment import SegmentType
+from pdf417decoder.MacroStore import MacroStore
+from pdf417decoder.BarcodeInfo import BarcodeInfo
+from pdf417decoder.MacroBlock import MacroBlock
+
+# the benchmark scripts are not part of the package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
+import regression
 
 def test_rotated():
     # given an image that has been rotated
@@ -100,4 +124,574 @@ def test_upside_down():
     # then the message should be decoded
     assert barcode_count == 1
     assert decoder.barcode_data_index_to_string(0) == "Upside Down Test"
-    
\ No newline at end of file
+    
+def test_batch_error_correction():
+    # given the codewords of a decoded barcode, a clean copy and a copy with errors
+    image = PIL.open("tests/blurred_error_correction.png")
+    context = DecodeContext(PDF417Decoder(), image)
+    context.decode()
+    clean = list(context.codewords)
+    corrupted = list(clean)
+    corrupted[5] = (corrupted[5] + 1) % 929
+    corrupted[40] = 0
+    corrupted[100] = 17
+
+    # when both copies are tested as one batch
+    results = pdf417decoder.ErrorCorrection.test_codewords_batch([list(clean), corrupted], context.error_correction_length)
+
+    # then the clean copy passes through and the errors are corrected
+    assert results[0] == (0, clean)
+    assert results[1][0] > 0
+    assert results[1][1] == clean
+
+def test_verify_only():
+    # given an image that has errors due to blurring
+    image = PIL.open("tests/blurred_error_correction.png")
+
+    # when we only verify the codewords
+    decoder = PDF417Decoder(image, verify_only=True)
+    barcode_count = decoder.decode()
+
+    # then the errors should be detected without decoding the data
+    assert barcode_count == 1
+    assert decoder.barcodes_info[0].error_correction_status == ErrorCorrectionStatus.ERRORS_DETECTED
+    assert decoder.barcodes_info[0].barcode_data is None
+
+def test_numeric_compaction():
+    # given numeric compaction codewords (ISO/IEC 15438 example)
+    context = DecodeContext(PDF417Decoder(), None)
+    context.codewords = [1, 624, 434, 632, 282, 200]
+    context.codewords_ptr = 0
+    binary_data = bytearray()
+
+    # when the codewords are converted
+    context.codewords_to_numeric(binary_data, 6)
+
+    # then the digits should be decoded
+    assert binary_data == b"000213298174000"
+
+def test_decode_segments():
+    # given an image that has a barcode with a character set, text and a shifted byte
+    image = PIL.open("tests/binary_data.png")
+
+    # when we decode the image segment by segment
+    decoder = PDF417Decoder(image)
+    segments = [(segment.segment_type, bytes(segment.data)) for segment in decoder.decode_segments()]
+
+    # then the segments should add up to the barcode data
+    assert [segment[0] for segment in segments] == [SegmentType.GLI, SegmentType.TEXT, SegmentType.BYTE, SegmentType.TEXT]
+    assert b"".join(segment[1] for segment in segments) == decoder.barcodes_data[0]
+
+def test_macro_control_block():
+    # given the codewords of a Macro PDF417 barcode, text "AB" then segment 2 of 3 of file 017053
+    context = DecodeContext(PDF417Decoder(), None)
+    context.data_columns = 2
+    context.data_rows = 7
+    context.error_correction_length = 2
+    context.codewords = [12, 1, 928, 111, 102, 17, 53, 923, 1, 111, 103, 922, 0, 0]
+
+    # when the codewords are converted to data
+    result = context.codewords_to_data()
+
+    # then the data and the control block should be decoded
+    assert result
+    assert context.barcode_binary_data == b"AB"
+    assert context.macro_block.segment_index == 2
+    assert context.macro_block.file_id == "017053"
+    assert context.macro_block.segment_count == 3
+    assert context.macro_block.is_last_segment
+
+def test_macro_store(tmp_path):
+    # given a store that spills to disk beyond 4 bytes
+    store = MacroStore(str(tmp_path), max_memory_bytes=4)
+
+    # when the segments of a file arrive out of order
+    assert not store.add_segment("017053", 2, b"Test", 3)
+    assert not store.add_segment("017053", 0, b"Macro ")
+    assert store.add_segment("017053", 1, b"PDF417 ")
+
+    # then the file should be assembled in order and removed from the store
+    assert b"".join(store.assemble("017053")) == b"Macro PDF417 Test"
+    assert len(store) == 0
+    assert len(list(tmp_path.iterdir())) == 0
+
+    # and a file assembled but never read should release its memory and spill files
+    store.add_segment("017054", 0, b"Two", 2)
+    store.add_segment("017054", 1, b"Spilled", 2)
+    store.assemble("017054")
+    assert store.memory_bytes == 0
+    store.close()
+    assert len(list(tmp_path.iterdir())) == 0
+
+    # and barcodes without data should be rejected
+    with pytest.raises(ValueError):
+        info = BarcodeInfo()
+        info.macro_block = MacroBlock(0, "017055")
+        info.barcode_data = None
+        store.add(info)
+
+def test_reused_decoder():
+    # given one decoder for many images
+    decoder = PDF417Decoder()
+
+    # when images of different sizes are decoded in turn
+    # then each image should be decoded with the reused buffers
+    assert decoder.decode(PIL.open("tests/rotated.png")) == 1
+    assert decoder.barcode_data_index_to_string(0) == "Rotated Image Test"
+    assert decoder.decode(PIL.open("tests/upside_down.png")) == 1
+    assert decoder.barcode_data_index_to_string(0) == "Upside Down Test"
+
+    # and after releasing the buffers
+    decoder.release_buffers()
+    assert decoder.decode(PIL.open("tests/multiple_barcodes.png")) == 2
+
+    # and two segment decodes interleaved on one thread should not share buffers
+    first = decoder.decode_segments(PIL.open("tests/multiple_barcodes.png"))
+    first_data = [bytes(next(first).data)]
+    second_data = [bytes(segment.data) for segment in decoder.decode_segments(PIL.open("tests/missing_data.png"))]
+    first_data.extend(bytes(segment.data) for segment in first)
+    assert b"".join(first_data) == b"MultipleBarcodes Test"
+    assert b"".join(second_data) == b"Barcode with missing data codewords."
+
+def test_thread_safe_decode():
+    # given one decoder shared by many threads
+    decoder = PDF417Decoder()
+    paths = ["tests/rotated.png", "tests/upside_down.png", "tests/multiple_barcodes.png"]
+    images = [np.asarray(PIL.open(path)) for path in paths] * 3
+
+    # when the images are decoded concurrently
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = list(executor.map(decoder.decode_image, images))
+
+    # then each result should match its own image
+    for index in range(0, len(results), 3):
+        assert results[index].barcodes_data == [b"Rotated Image Test"]
+        assert results[index + 1].barcodes_data == [b"Upside Down Test"]
+        assert results[index + 2].barcodes_data == [b"Multiple", b"Barcodes Test"]
+
+def test_decode_many():
+    # given image paths, a PIL image and a path that does not exist
+    sources = ["tests/rotated.png", PIL.open("tests/upside_down.png"), "tests/missing.png", "tests/multiple_barcodes.png"]
+
+    # when the images are decoded in a process pool
+    results = decode_many(sources, workers=2, chunksize=2)
+
+    # then the results should be in order and the error captured
+    assert results[0].barcodes_data == [b"Rotated Image Test"]
+    assert results[1].barcodes_data == [b"Upside Down Test"]
+    assert results[2].error is not None
+    assert results[3].barcodes_data == [b"Multiple", b"Barcodes Test"]
+
+def test_async_decoder():
+    # given an async decoder with a single slot
+    async def decode_images():
+        async with AsyncDecoder(max_concurrency=1) as decoder:
+            # when the first decode times out
+            with pytest.raises(asyncio.TimeoutError):
+                await decoder.decode("tests/rotated.png", timeout=0.001)
+
+            # then it should hold its slot until the executor has finished it
+            assert decoder.in_flight == 1
+
+            # and the next decode should get the slot once it is free
+            result = await decoder.decode("tests/upside_down.png", timeout=30)
+            assert decoder.in_flight == 0
+            return result
+
+    result = asyncio.run(decode_images())
+    assert result.barcodes_data == [b"Upside Down Test"]
+
+    # and a timed out decode still queued in a smaller executor should be cancelled
+    async def cancel_queued():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            decoder = AsyncDecoder(executor=executor, max_concurrency=2)
+            running = asyncio.ensure_future(decoder.decode("tests/rotated.png", timeout=30))
+            await asyncio.sleep(0)
+
+            with pytest.raises(asyncio.TimeoutError):
+                await decoder.decode("tests/upside_down.png", timeout=0.001)
+            await asyncio.sleep(0)
+
+            # only the running decode should hold a slot
+            assert decoder.in_flight == 1
+            return await running
+
+    assert asyncio.run(cancel_queued()).barcodes_data == [b"Rotated Image Test"]
+
+    # and process workers should decode with the options of the decoder
+    async def decode_in_process():
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            async with AsyncDecoder(PDF417Decoder(max_barcodes=1, timings=True, counters=True), executor) as decoder:
+                return await decoder.decode("tests/multiple_barcodes.png", timeout=60)
+
+    result = asyncio.run(decode_in_process())
+    assert len(result) == 1
+    assert result.timings.calls("convert_image") == 1
+    assert result.counters.rows_scanned > 0
+
+def test_decode_iter(tmp_path):
+    # given a multi-page TIFF and a missing file
+    pages = [PIL.open("tests/rotated.png").convert("L"), PIL.open("tests/upside_down.png").convert("L")]
+    tiff_path = str(tmp_path / "pages.tiff")
+    pages[0].save(tiff_path, save_all=True, append_images=pages[1:])
+
+    # when decoding them with prefetching
+    results = list(decode_iter([tiff_path, "tests/missing.png", "tests/binary_data.png"], prefetch=2))
+
+    # then each page should be decoded in order and the missing file reported
+    assert [(result.source_index, result.page_index) for result in results] == [(0, 0), (0, 1), (1, 0), (2, 0)]
+    assert results[0].barcodes_data == [b"Rotated Image Test"]
+    assert results[1].barcodes_data == [b"Upside Down Test"]
+    assert "FileNotFoundError" in results[2].error
+    assert len(results[3]) == 1
+
+    # and a decoder cache should be used, pages decoded before being hits
+    cache = MemoryCache()
+    decoder = PDF417Decoder(cache=cache)
+    list(decode_iter([tiff_path], decoder=decoder))
+    cached = list(decode_iter([tiff_path, "tests/binary_data.png"], decoder=decoder))
+    assert (cache.hits, cache.misses) == (2, 3)
+    assert [result.barcodes_data for result in cached[:2]] == [[b"Rotated Image Test"], [b"Upside Down Test"]]
+    assert cached[2].barcodes_data == results[3].barcodes_data
+
+def test_tracking_session():
+    # given frames where the barcode moves a few pixels each frame
+    image = np.asarray(PIL.open("tests/multiple_barcodes.png").convert("L"))
+    height, width = image.shape
+    frames = list()
+    for index in range(4):
+        frame = np.full((height + 40, width + 40), 255, dtype=np.uint8)
+        frame[index * 3:index * 3 + height, index * 4:index * 4 + width] = image
+        frames.append(frame)
+
+    # when decoding the frames in a tracking session
+    session = TrackingSession()
+    results = [session.decode(frame) for frame in frames]
+
+    # then only the first frame should be scanned and the payloads reported once
+    assert sorted(results[0].barcodes_data) == [b"Barcodes Test", b"Multiple"]
+    assert [len(result) for result in results[1:]] == [0, 0, 0]
+    assert session.full_scans == 1
+    assert session.tracked_frames == 3
+
+def test_tracking_session_rescan():
+    # given frames where a second barcode enters the frame while the first stays visible
+    first = encode_image(b"First barcode", columns=4)
+    second = encode_image(b"Second barcode", columns=4)
+    height = first.shape[0] + second.shape[0] + 40
+    width = max(first.shape[1], second.shape[1]) + 40
+    frames = list()
+    for index in range(5):
+        frame = np.full((height, width), 255, dtype=np.uint8)
+        frame[10:10 + first.shape[0], 10:10 + first.shape[1]] = first
+        if (index > 0):
+            top = first.shape[0] + 30
+            frame[top:top + second.shape[0], 10:10 + second.shape[1]] = second
+        frames.append(frame)
+
+    # when decoding the frames with a rescan every 2 tracked frames and a time budget
+    session = TrackingSession(PDF417Decoder(time_budget=5.0), rescan_interval=2)
+    results = [session.decode(frame) for frame in frames]
+
+    # then the second barcode should be reported by the rescan, once
+    assert results[0].barcodes_data == [b"First barcode"]
+    assert [result.barcodes_data for result in results[1:]] == [[], [], [b"Second barcode"], []]
+    assert session.full_scans == 2
+    assert len(session.tracked) == 2
+
+def test_max_barcodes():
+    # given an image with two barcodes
+    image = PIL.open("tests/multiple_barcodes.png")
+
+    # when decoding with early exit options
+    first = PDF417Decoder(first_only=True).decode_image(image)
+    both = PDF417Decoder(max_barcodes=2).decode_image(image)
+
+    # then decoding should stop once enough barcodes are decoded
+    assert len(first) == 1
+    assert first.barcodes_data[0] in (b"Multiple", b"Barcodes Test")
+    assert len(both) == 2
+
+def test_time_budget():
+    # given a decoder without any time left
+    decoder = PDF417Decoder(time_budget=0)
+
+    # when decoding an image
+    result = decoder.decode_image(PIL.open("tests/multiple_barcodes.png"))
+
+    # then the decode should stop with a timed out status instead of raising
+    assert result.timed_out
+    assert len(result) == 0
+
+    # and a generous budget should not change the result
+    result = PDF417Decoder(time_budget=60).decode_image(PIL.open("tests/multiple_barcodes.png"))
+    assert not result.timed_out
+    assert len(result) == 2
+
+def test_result_cache(tmp_path):
+    # given decoders with a memory cache and an on disk cache
+    memory_cache = MemoryCache(max_entries=1)
+    decoder = PDF417Decoder(cache=memory_cache)
+
+    # when decoding the same image twice, then another image
+    first = decoder.decode_image(PIL.open("tests/rotated.png"))
+    second = decoder.decode_image(PIL.open("tests/rotated.png"))
+    decoder.decode_image(PIL.open("tests/upside_down.png"))
+
+    # then the repeat should be a cache hit and the oldest entry evicted
+    assert second.barcodes_data == first.barcodes_data
+    assert (memory_cache.hits, memory_cache.misses, memory_cache.evictions) == (1, 2, 1)
+
+    # and a hit should be a new copy, changing it should not change the cache
+    cached = MemoryCache()
+    decoder = PDF417Decoder(cache=cached, timings=True)
+    decoder.decode_image(PIL.open("tests/rotated.png"))
+    hit = decoder.decode_image(PIL.open("tests/rotated.png"))
+    hit.barcodes_info[0].barcode_data[0:1] = b"X"
+    assert hit.timings is None
+    assert decoder.decode_image(PIL.open("tests/rotated.png")).barcodes_data == [b"Rotated Image Test"]
+
+    # and the on disk cache should keep results across decoders
+    with SQLiteCache(str(tmp_path / "results.db")) as disk_cache:
+        assert PDF417Decoder(cache=disk_cache).decode(PIL.open("tests/rotated.png")) == 1
+        decoder = PDF417Decoder(cache=disk_cache)
+        assert decoder.decode(PIL.open("tests/rotated.png")) == 1
+        assert decoder.barcodes_data == [b"Rotated Image Test"]
+        assert disk_cache.hits == 1
+
+        # and a stored value that is not a plain record should be a miss, never unpickled
+        disk_cache._connection.execute("UPDATE records SET value = ?", (pickle.dumps(DecodeResult()).hex(),))
+        assert decoder.decode(PIL.open("tests/rotated.png")) == 1
+        assert disk_cache.misses == 2
+
+    # and an on disk codeword cache should restore the corrected codewords and data
+    image = PIL.open("tests/blurred_error_correction.png")
+    with SQLiteCache(str(tmp_path / "codewords.db")) as codeword_cache:
+        expected = PDF417Decoder(codeword_cache=codeword_cache).decode_image(image)
+        result = PDF417Decoder(codeword_cache=codeword_cache).decode_image(image)
+        assert codeword_cache.hits == 1
+        assert result.barcodes_data == expected.barcodes_data
+        assert result.barcodes_info[0].error_correction_status == expected.barcodes_info[0].error_correction_status
+
+def test_codeword_cache():
+    # given a decoder with a codeword cache and a barcode needing error correction
+    codeword_cache = MemoryCache(max_entries=16)
+    decoder = PDF417Decoder(codeword_cache=codeword_cache)
+    image = PIL.open("tests/blurred_error_correction.png")
+    expected = PDF417Decoder().decode_image(image)
+
+    # when decoding the same barcode twice
+    first = decoder.decode_image(image)
+    segments = list(decoder.decode_segments(image))
+
+    # then the second decode should reuse the corrected codewords and data
+    assert codeword_cache.hits == 1
+    assert first.barcodes_data == expected.barcodes_data
+    assert decoder.barcodes_data == expected.barcodes_data
+    assert decoder.barcodes_info[0].error_correction_count == expected.barcodes_info[0].error_correction_count
+    assert b"".join(bytes(segment.data) for segment in segments) == expected.barcodes_data[0]
+
+def test_shared_memory_pool():
+    # given frames larger than the slots and more frames than slots
+    frames = [np.asarray(PIL.open(path)) for path in ["tests/rotated.png", "tests/upside_down.png", "tests/multiple_barcodes.png", "tests/binary_data.png"]]
+
+    # when the frames are decoded through shared memory slots
+    with SharedMemoryPool(workers=2, slots=2, slot_bytes=1024) as pool:
+        results = pool.decode_many(frames)
+
+    # and unreadable sources between frames should give error results in order
+    with SharedMemoryPool(workers=1, slots=1, slot_bytes=1024) as pool:
+        mixed = pool.decode_many([frames[0], "tests/missing.png", b"not an image", frames[1]])
+    assert [result.error is not None for result in mixed] == [False, True, True, False]
+    assert mixed[3].barcodes_data == [b"Upside Down Test"]
+
+    # then the results should match decoding in this process, in order
+    decoder = PDF417Decoder()
+    for frame, result in zip(frames, results):
+        expected = decoder.decode_image(frame)
+        assert result.barcodes_data == expected.barcodes_data
+        assert [info.error_correction_status for info in result.barcodes_info] == [info.error_correction_status for info in expected.barcodes_info]
+
+def test_tiled_decode(tmp_path):
+    # given a large TIFF with barcodes crossing tile edges
+    page = np.full((1600, 1400), 255, dtype=np.uint8)
+    rotated = np.asarray(PIL.open("tests/rotated.png").convert("L"))
+    multiple = np.asarray(PIL.open("tests/multiple_barcodes.png").convert("L"))
+    page[300:300 + rotated.shape[0], 250:250 + rotated.shape[1]] = rotated
+    page[900:900 + multiple.shape[0], 100:100 + multiple.shape[1]] = multiple
+    tiff_path = str(tmp_path / "page.tif")
+    PIL.fromarray(page).save(tiff_path)
+
+    # when decoding the memory mapped TIFF with small tiles
+    result = decode_tiled(tmp_path / "page.tif", tile_size=400)
+
+    # then the barcodes should be found as in a whole image decode
+    assert sorted(result.barcodes_data) == sorted(PDF417Decoder().decode_image(page).barcodes_data)
+    assert len(result) == 3
+
+    # and the tiles should give their scratch buffers back for the next decode of the thread
+    decoder = PDF417Decoder()
+    decoder.decode_image(page)
+    kept = set(decoder.idle_buffers())
+    decode_tiled(page, tile_size=256, decoder=decoder)
+    assert kept <= set(decoder.idle_buffers())
+
+    # and a TIFF with inverted gray pixels (white is zero) should not be memory mapped as is
+    inverted_path = str(tmp_path / "inverted.tif")
+    PIL.fromarray(page).save(inverted_path, tiffinfo={262: 0})
+    with pytest.raises(ValueError):
+        open_raster(inverted_path)
+
+def test_stage_timings():
+    # given a decoder recording stage timings through a callback
+    reported = list()
+    decoder = PDF417Decoder(timings_callback=reported.append)
+
+    # when decoding an upside down barcode
+    result = decoder.decode_image(PIL.open("tests/upside_down.png"))
+
+    # then every stage should be timed, the rotated scan separately
+    assert len(result) == 1
+    for stage in ("convert_image", "locate_barcodes", "rescan_rotated", "left_indicators", "right_indicators",
+        "set_trans_matrix", "get_codewords", "error_correction", "codewords_to_data"):
+        assert result.timings.calls(stage) == 1
+    assert result.timings.seconds("locate_barcodes") >= result.timings.seconds("rescan_rotated")
+
+    # and the callback should receive the same timings
+    assert reported == [result.timings]
+
+    # and a decoder without timings should not record any
+    assert PDF417Decoder().decode_image(PIL.open("tests/upside_down.png")).timings is None
+
+    # and a tiled decode should report the timings of all its tiles and windows once
+    reported.clear()
+    tiled = decode_tiled(np.asarray(PIL.open("tests/rotated.png").convert("L")), tile_size=400, decoder=decoder)
+    assert tiled.timings.calls("convert_image") == 3 * 2 + 1
+    assert tiled.timings.calls("get_codewords") == 1
+    assert reported == [tiled.timings]
+
+    # and pool workers should return the timings with the result record
+    with SharedMemoryPool(workers=1, slots=1, timings=True) as pool:
+        pooled = pool.decode_many([np.asarray(PIL.open("tests/upside_down.png"))])[0]
+    assert pooled.timings.calls("rescan_rotated") == 1
+    assert decode_many(["tests/upside_down.png"], workers=1, timings=True)[0].timings.calls("rescan_rotated") == 1
+
+def test_decode_counters():
+    # given a decoder counting hot path events
+    decoder = PDF417Decoder(counters=True)
+
+    # when decoding a barcode with data concealed by marks
+    result = decoder.decode_image(PIL.open("tests/missing_data.png"))
+
+    # then the image scan and the codeword scans should be counted
+    assert len(result) == 1
+    assert result.counters.rows_scanned > 0
+    assert result.counters.signature_windows > 0
+    assert result.counters.border_lists_created >= 2
+    assert result.counters.candidate_pairs >= 1
+
+    # and the barcode should report its erasures and corrected errors
+    counters = result.barcodes_info[0].counters
+    assert counters.get_codeword_calls > 0
+    assert counters.erasures > 0
+    assert counters.errors_corrected == result.barcodes_info[0].error_correction_count
+    assert result.counters.get_codeword_calls >= counters.get_codeword_calls
+
+    # and a decoder without counters should not count
+    result = PDF417Decoder().decode_image(PIL.open("tests/missing_data.png"))
+    assert result.counters is None and result.barcodes_info[0].counters is None
+
+    # and a tiled decode should sum the counters of its tiles and windows
+    page = np.asarray(PIL.open("tests/missing_data.png").convert("L"))
+    tiled = decode_tiled(page, tile_size=256, decoder=decoder)
+    assert tiled.counters.rows_scanned >= page.shape[0]
+    assert tiled.counters.candidate_pairs == 1
+    assert tiled.counters.get_codeword_calls == tiled.barcodes_info[0].counters.get_codeword_calls
+
+    # and the trial matches of an early stopping scan should not count as candidate pairs
+    assert PDF417Decoder(counters=True, max_barcodes=1).decode_image(PIL.open("tests/missing_data.png")).counters.candidate_pairs == 1
+
+    # and pool workers should return the counters with the result record
+    with SharedMemoryPool(workers=1, slots=1, counters=True) as pool:
+        pooled = pool.decode_many([np.asarray(PIL.open("tests/missing_data.png"))])[0]
+    expected = decoder.decode_image(PIL.open("tests/missing_data.png"))
+    assert pooled.counters.as_dict() == expected.counters.as_dict()
+    assert pooled.barcodes_info[0].counters.as_dict() == expected.barcodes_info[0].counters.as_dict()
+
+def test_encoder_round_trip():
+    # given text, numeric and binary data
+    samples = [b"Hello World! PDF417 {test} #42 ~end", b"1234567890" * 10, bytes(range(256))]
+
+    for data in samples:
+        # when encoding and rendering the data
+        rows = encode(data, columns=8, security_level=3)
+        image = render(rows, module_size=2, ratio=3)
+
+        # then the error correction codewords should check
+        codewords = [codeword for row in rows for codeword in row[1:-1]]
+        assert pdf417decoder.ErrorCorrection.verify_codewords(codewords, 16)
+
+        # and the decoder should read the data back
+        result = PDF417Decoder().decode_image(image)
+        assert result.barcodes_data == [bytearray(data)]
+        assert result.barcodes_info[0].data_columns == 8
+        assert result.barcodes_info[0].error_correction_length == 16
+
+    # and data too long for the barcode should be rejected
+    with pytest.raises(ValueError):
+        encode_image(bytes(2000), columns=3)
+
+    # and the bar patterns should be those of the ISO/IEC 15438 symbol character table
+    assert BAR_PATTERNS[0][0] == (3, 1, 1, 1, 1, 1, 3, 6)
+    assert BAR_PATTERNS[1][0] == (5, 1, 1, 1, 1, 1, 2, 5)
+    assert BAR_PATTERNS[2][0] == (2, 1, 1, 1, 1, 1, 5, 5)
+    assert BAR_PATTERNS[0][928] == (2, 1, 5, 1, 4, 1, 1, 2)
+
+def benchmark_report(calibration: float, seconds: float, stage_seconds: float, micro_seconds: float, success: dict) -> dict:
+    """ Synthetic benchmark report of two cases """
+    return {
+        "calibration_seconds": calibration,
+        "seconds": seconds,
+        "cases": 2,
+        "stages": {"locate_barcodes": {"seconds": stage_seconds, "calls": 2}},
+        "micro": {"binarize": micro_seconds},
+        "success_rate": sum(1 for value in success.values() if (value)) / 2,
+        "case_results": [{"name": name, "success": value} for name, value in success.items()],
+    }
+
+def test_regression_compare():
+    # given a baseline and a run on a machine twice as slow with the same normalized costs
+    baseline = {
+        "metrics": regression.normalize(benchmark_report(1.0, 2.0, 1.0, 0.001, {"a": True, "b": True})),
+        "success_rate": 1.0,
+        "succeeded": ["a", "b"],
+    }
+    slower_machine = benchmark_report(2.0, 4.0, 2.0, 0.002, {"a": True, "b": True})
+
+    # when comparing them, then the calibration should cancel out and nothing regress
+    rows = regression.compare(baseline, slower_machine, 0.25)
+    assert baseline["metrics"] == {"seconds_per_decode": 1.0, "stage/locate_barcodes": 0.5, "micro/binarize": 0.001}
+    assert [(row[0], row[3], row[4]) for row in rows] == [
+        ("micro/binarize", 0.0, False), ("seconds_per_decode", 0.0, False), ("stage/locate_barcodes", 0.0, False),
+        ("success_rate", 0.0, False)]
+
+    # and costs should regress only beyond their tolerance, micro-benchmarks beyond the micro tolerance
+    within = {row[0]: row[4] for row in regression.compare(baseline, benchmark_report(1.0, 2.4, 1.2, 0.0014, {"a": True, "b": True}), 0.25)}
+    beyond = {row[0]: row[4] for row in regression.compare(baseline, benchmark_report(1.0, 2.6, 1.3, 0.0016, {"a": True, "b": True}), 0.25)}
+    assert within == {"micro/binarize": False, "seconds_per_decode": False, "stage/locate_barcodes": False, "success_rate": False}
+    assert beyond == {"micro/binarize": True, "seconds_per_decode": True, "stage/locate_barcodes": True, "success_rate": False}
+
+    # and a case no longer decoded should fail the success rate and the case check
+    rows = regression.compare(baseline, benchmark_report(1.0, 2.0, 1.0, 0.001, {"a": True, "b": False}), 0.25)
+    assert [row for row in rows if (row[4])] == [("success_rate", 1.0, 0.5, -0.5, True), ("case/b", 1.0, 0.0, -1.0, True)]
+
+    # and missing metrics and cases should be reported as failures
+    report = benchmark_report(1.0, 2.0, 1.0, 0.001, {"a": True})
+    del report["micro"]
+    rows = regression.compare(baseline, report, 0.25)
+    assert ("micro/binarize", 0.001, None, None, True) in rows
+    assert ("case/b", 1.0, None, None, True) in rows
+
+    message = regression.format_comparison(rows, 0.25)
+    assert [line.split()[0] for line in message.splitlines() if (line.endswith("MISSING"))] == ["micro/binarize", "case/b"]
+    assert message.splitlines()[-1] == "3 of 5 checks failed (costs 25%, micro-benchmarks 50% tolerance, no success drop)"